@@ -0,0 +1,152 @@
+"""
+Latency and throughput of obfuscate_many_async against a thread pool of obfuscate_data.
+
+S3 is stood in by moto (in-process), every S3 call gets an extra simulated round trip.
+While each run works, a probe coroutine measures how late the event loop wakes up.
+
+    PYTHONPATH=src:. python benchmarks/async_vs_threads.py --files 64 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pandas as pd
+from moto import mock_aws
+
+from utils.async_obfuscator import obfuscate_many_async
+from utils.obfuscator_lib import obfuscate_data
+
+BUCKET = "benchmark-bucket"
+PII_FIELDS = ["name", "email_address"]
+
+
+def _setup_bucket(s3_client, files, rows):
+    s3_client.create_bucket(
+        Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": "eu-west-2"}
+    )
+    body = (
+        pd.DataFrame(
+            {
+                "student_id": range(100_000_000, 100_000_000 + rows),
+                "name": [f"Student {i}" for i in range(rows)],
+                "email_address": [f"student{i}@email.com" for i in range(rows)],
+                "course": ["Software", "Data Science", "DevOps", "Cloud"] * (rows // 4),
+            }
+        )
+        .to_csv(index=False)
+        .encode("utf-8")
+    )
+    for i in range(files):
+        s3_client.put_object(Bucket=BUCKET, Key=f"new_data/file{i}.csv", Body=body)
+    return [f"s3://{BUCKET}/new_data/file{i}.csv" for i in range(files)]
+
+
+async def _probe_loop_lag(stop, interval=0.01):
+    """Worst delay of a 10ms sleep on the event loop while the run is going."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+def run_threads(s3_client, sources, concurrency):
+    def process_file(source):
+        start_time = time.perf_counter()
+        key = source.split(f"s3://{BUCKET}/")[1]
+        body = s3_client.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+        stream = obfuscate_data(body, PII_FIELDS, file_format="csv")
+        s3_client.put_object(
+            Bucket=BUCKET, Key=f"threads/{key}", Body=stream.getvalue()
+        )
+        return time.perf_counter() - start_time
+
+    async def main():
+        # the blocking call offloaded from a coroutine, as an asyncio service would do it
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_loop_lag(stop))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, process_file, source)
+                    for source in sources
+                )
+            )
+        stop.set()
+        return list(latencies), await probe
+
+    return asyncio.run(main())
+
+
+def run_async(s3_client, sources, concurrency):
+    async def main():
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_loop_lag(stop))
+        results = await obfuscate_many_async(
+            sources,
+            PII_FIELDS,
+            f"s3://{BUCKET}/async/",
+            max_in_flight=concurrency,
+            s3_client=s3_client,
+        )
+        stop.set()
+        return [result["seconds"] for result in results], await probe
+
+    return asyncio.run(main())
+
+
+def _print_result(name, files, elapsed, latencies, loop_lag):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(
+        f"{name:<8} {files / elapsed:8.1f} files/s   "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+        f"p95 {p95 * 1000:7.1f} ms   "
+        f"max loop lag {loop_lag * 1000:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--latency-ms", type=float, default=20, help="Simulated S3 round trip"
+    )
+    args = parser.parse_args()
+
+    for name, value in (
+        ("AWS_ACCESS_KEY_ID", "testing"),
+        ("AWS_SECRET_ACCESS_KEY", "testing"),
+        ("AWS_DEFAULT_REGION", "eu-west-2"),
+    ):
+        os.environ.setdefault(name, value)
+
+    with mock_aws():
+        s3_client = boto3.client("s3", region_name="eu-west-2")
+        sources = _setup_bucket(s3_client, args.files, args.rows)
+        s3_client.meta.events.register(
+            "before-call.s3", lambda **kwargs: time.sleep(args.latency_ms / 1000)
+        )
+
+        print(
+            f"{args.files} files x {args.rows} rows, concurrency {args.concurrency}, "
+            f"simulated S3 latency {args.latency_ms} ms"
+        )
+        for name, run in (("threads", run_threads), ("async", run_async)):
+            start_time = time.perf_counter()
+            latencies, loop_lag = run(s3_client, sources, args.concurrency)
+            elapsed = time.perf_counter() - start_time
+            _print_result(name, args.files, elapsed, latencies, loop_lag)
+
+
+if __name__ == "__main__":
+    main()
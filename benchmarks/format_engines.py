@@ -0,0 +1,104 @@
+"""
+Throughput of every registered format engine, one by one.
+
+The same sample table is written in each format by the engine itself, then the schema
+probe, the in-memory read, the streaming read and an obfuscate_data round trip (same
+format in and out) are timed. Engines registered before the run are included too.
+
+    PYTHONPATH=src:. python benchmarks/format_engines.py --rows 200000 --chunksize 50000
+"""
+
+import argparse
+import time
+from io import BytesIO
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.format_engines import get_engine, supported_formats
+from utils.obfuscator_lib import obfuscate_data
+
+PII_FIELDS = ["name", "email_address"]
+
+
+def _sample_frame(rows):
+    return pd.DataFrame(
+        {
+            "student_id": range(100_000_000, 100_000_000 + rows),
+            "name": [f"Student {i}" for i in range(rows)],
+            "email_address": [f"student{i}@email.com" for i in range(rows)],
+            "course": ["Software", "Data Science", "DevOps", "Cloud"] * (rows // 4),
+            "graduation_date": ["2024-03-31"] * rows,
+        }
+    )
+
+
+def _best_of(runs, func):
+    best = None
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _engine_file(engine, df):
+    sink = BytesIO()
+    writer = engine.open_writer(sink)
+    writer.write(df)
+    writer.close()
+    return sink.getvalue()
+
+
+def _consume(frames):
+    for _ in frames:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    df = _sample_frame(args.rows)
+    print(f"{args.rows} rows, chunks of {args.chunksize}, best of {args.runs} runs")
+    for engine in map(get_engine, supported_formats()):
+        data = _engine_file(engine, df)
+
+        def source():
+            return pa.BufferReader(data)
+
+        write = _best_of(args.runs, lambda: _engine_file(engine, df))
+        probe = _best_of(args.runs, lambda: engine.probe_schema(source(), False))
+        read = _best_of(args.runs, lambda: engine.read(source(), False))
+        streaming = None
+        if engine.chunkable:
+            streaming = _best_of(
+                args.runs,
+                lambda: _consume(engine.iter_chunks(source(), False, args.chunksize)),
+            )
+        obfuscate = _best_of(
+            args.runs,
+            lambda: obfuscate_data(
+                data, PII_FIELDS, file_format=engine.name, chunksize=args.chunksize
+            ),
+        )
+        print(
+            f"{engine.name:<8} {len(data) / 1024 / 1024:7.1f} MB   "
+            f"probe {probe * 1000:7.1f} ms   "
+            f"read {args.rows / read:10.0f} rows/s   "
+            + (
+                f"streaming {args.rows / streaming:10.0f} rows/s   "
+                if streaming
+                else f"streaming {'-':>10}          "
+            )
+            + f"write {args.rows / write:10.0f} rows/s   "
+            f"obfuscate {args.rows / obfuscate:10.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
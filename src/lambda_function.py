@@ -1,9 +1,13 @@
 from urllib.parse import urlparse
+from botocore.exceptions import ClientError
 import logging
 import boto3
+import json
 import os
+import time
 
-from utils.obfuscator_lib import obfuscate_data
+from utils.obfuscator_lib import obfuscate_data, obfuscate_dataset
+from utils.token_vault import DynamoDBVault
 
 # from .utils import obfuscate_data  # for utils/__init__.py
 
@@ -12,6 +16,92 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 
+# Per-prefix PII rules cache. Lives in the Lambda container, so warm invocations
+# reuse the rules and only revalidate them (ETag) once the TTL has expired.
+_PII_RULES_CACHE = {"uri": None, "etag": None, "rules": None, "checked_at": 0.0}
+
+# Token vault of the 'tokenize' strategy, kept in the container with its LRU cache
+_TOKEN_VAULT = None
+
+
+def _get_token_vault():
+    """Returns the DynamoDB token vault of the TOKEN_VAULT_TABLE env variable."""
+    global _TOKEN_VAULT
+    table_name = os.environ.get("TOKEN_VAULT_TABLE")
+    if not table_name:
+        raise ValueError("TOKEN_VAULT_TABLE must be set for the 'tokenize' strategy")
+    if _TOKEN_VAULT is None or _TOKEN_VAULT.table_name != table_name:
+        _TOKEN_VAULT = DynamoDBVault(
+            table_name,
+            cache_size=int(os.environ.get("TOKEN_CACHE_SIZE", 100_000)),
+        )
+    return _TOKEN_VAULT
+
+
+# ==========================================================
+# PII RULES CONFIG (S3)
+# ==========================================================
+def load_pii_rules(s3_client, rules_uri, ttl_seconds=300):
+    """
+    Loads the per-prefix PII rules from a JSON config object in S3.
+
+    Within the TTL the cached rules are returned without any S3 request. After the TTL
+    a conditional GET (If-None-Match: <ETag>) is sent, an unchanged config answers with
+    304 Not Modified and no body, so only a real change downloads the object again.
+
+    Config format:
+        {"rules": [{"prefix": "new_data/", "pii_fields": ["name"], "primary_key": "id",
+                    "strategy": "mask", "output_format": "parquet"}]}
+
+    Args:
+        s3_client (boto3.client): S3 client.
+        rules_uri (str): S3 URI of the config (s3://config_bucket/pii_rules.json).
+        ttl_seconds (float): Seconds the cached rules are used without revalidation.
+
+    Returns:
+        list: The rules (list of dicts).
+
+    Raises:
+        ValueError: If the config has no 'rules' list or a rule has no 'prefix'.
+    """
+    cache = _PII_RULES_CACHE
+    now = time.monotonic()
+    is_cached = cache["uri"] == rules_uri and cache["rules"] is not None
+
+    if is_cached and now - cache["checked_at"] < ttl_seconds:
+        return cache["rules"]
+
+    parsed_url = urlparse(rules_uri)
+    request = {"Bucket": parsed_url.netloc, "Key": parsed_url.path.lstrip("/")}
+    if is_cached and cache["etag"]:
+        request["IfNoneMatch"] = cache["etag"]
+
+    try:
+        response = s3_client.get_object(**request)
+    except ClientError as e:
+        if is_cached and e.response["Error"]["Code"] in ("304", "NotModified"):
+            logger.info(f"PII rules not modified: {rules_uri}")
+            cache["checked_at"] = now
+            return cache["rules"]
+        raise
+
+    rules = json.loads(response["Body"].read()).get("rules")
+    if not isinstance(rules, list) or not all("prefix" in rule for rule in rules):
+        raise ValueError(
+            f"PII rules config {rules_uri} must be a list of rules with 'prefix'"
+        )
+
+    cache.update(uri=rules_uri, etag=response.get("ETag"), rules=rules, checked_at=now)
+    logger.info(f"PII rules loaded: {rules_uri}, {len(rules)} rule(s)")
+    return rules
+
+
+def match_pii_rule(rules, key):
+    """Returns the rule with the longest prefix matching the object key, or None."""
+    matching = [rule for rule in rules if key.startswith(rule["prefix"])]
+    return max(matching, key=lambda rule: len(rule["prefix"])) if matching else None
+
+
 # ==========================================================
 # CALLING PROCEDURE | LAMBDA HANDLER
 # Handels the AWS Infrastructure and Saving procedure for demonstration purposes.
@@ -27,12 +117,28 @@ def lambda_handler(event, context):
     Args:
         event (dict): A JSON string (passed as a dict) containing:
             - 'file_to_obfuscate' (str): S3 URI (s3://ingestion_bucket/new_data/test_data.csv).
+            - 'dataset_to_obfuscate' (str, optional): S3 prefix of a partitioned dataset,
+              instead of 'file_to_obfuscate' (see obfuscate_dataset).
             - 'pii_fields' (list): List of column names to be masked.
             - 'primary_key' (str, optional): Primary key column name.
+            - 'output_format' (str, optional): 'csv', 'json', 'parquet' or 'orc' output
+              conversion.
+            - 'compression' (str, optional): Parquet / ORC compression codec, eg 'zstd'.
+            - 'row_group_size' (int, optional): Target rows per Parquet row group.
+            - 'strategy' (str, optional): 'mask' (default) or 'tokenize' (reversible
+              tokens in the DynamoDB vault of the TOKEN_VAULT_TABLE env variable).
+            Missing options are taken from the matching rule of the PII_RULES_URI config
+            object (see load_pii_rules), then from the PII_FIELDS, PRIMARY_KEY,
+            OUTPUT_FORMAT, PARQUET_COMPRESSION and PARQUET_ROW_GROUP_SIZE env variables.
+            MEMORY_BUDGET_MB and PROFILE_MEMORY set the memory budget and profiling.
+            KMS_KEY_ID envelope encrypts the outputs, a file is streamed into a multipart
+            upload while it is encrypted.
         context (object): AWS Lambda context object (unused).
 
     Returns:
-        dict: Status of the obfuscation process: status code and success message.
+        dict: Status of the obfuscation process: status code, success message,
+            the integrity report (also stored as metadata of the output object) and
+            the memory report (if MEMORY_BUDGET_MB or PROFILE_MEMORY is set).
 
     Raises:
         ValueError: If required (parameter) keys are missing from the event.
@@ -45,22 +151,64 @@ def lambda_handler(event, context):
 
         # Get parameters from the EventBridge event (vagy környezeti változókból)
         s3_source_path = event.get("file_to_obfuscate")
-        pii_fields = event.get("pii_fields")
-        primary_key = event.get("primary_key")
+        # Dataset mode: every partition file under a prefix (s3://bucket/lake/students/)
+        dataset_prefix = event.get("dataset_to_obfuscate")
+        s3_source_path = s3_source_path or dataset_prefix
+        is_eventbridge_event = not s3_source_path and "detail" in event
 
         # Optional: EventBridge S3 PutObject event structure (get parameters from env var)
-        if not s3_source_path and "detail" in event:
+        if is_eventbridge_event:
             ingestion_bucket = event["detail"]["bucket"]["name"]
             org_source_key = event["detail"]["object"]["key"]
             s3_source_path = f"s3://{ingestion_bucket}/{org_source_key}"
+
+        # Per-prefix rules from the S3 config object (cached in the container)
+        rule = {}
+        rules_uri = os.environ.get("PII_RULES_URI")
+        if s3_source_path and rules_uri:
+            rules = load_pii_rules(
+                s3_client,
+                rules_uri,
+                ttl_seconds=float(os.environ.get("PII_RULES_TTL_SECONDS", 300)),
+            )
+            rule = (
+                match_pii_rule(rules, urlparse(s3_source_path).path.lstrip("/")) or {}
+            )
+            logger.info(f"Matched PII rule prefix: {rule.get('prefix')}")
+
+        pii_fields = event.get("pii_fields") or rule.get("pii_fields")
+        primary_key = event.get("primary_key") or rule.get("primary_key")
+        strategy = event.get("strategy") or rule.get("strategy") or "mask"
+
+        if is_eventbridge_event:
             if not pii_fields:
                 pii_fields = os.environ.get("PII_FIELDS", "").split(",")
             if not primary_key:
                 primary_key = os.environ.get("PRIMARY_KEY")
 
+        # Output conversion (eg csv -> parquet), event payload first then rule, env variables
+        output_format = (
+            event.get("output_format")
+            or rule.get("output_format")
+            or os.environ.get("OUTPUT_FORMAT")
+        )
+        compression = (
+            event.get("compression")
+            or rule.get("compression")
+            or os.environ.get("PARQUET_COMPRESSION")
+        )
+        row_group_size = (
+            event.get("row_group_size")
+            or rule.get("row_group_size")
+            or os.environ.get("PARQUET_ROW_GROUP_SIZE")
+        )
+
         # Error handling for missing parameters
         if not s3_source_path or not pii_fields:
-            raise ValueError("Event must contain 'file_to_obfuscate' and 'pii_fields'")
+            raise ValueError(
+                "Event must contain 'file_to_obfuscate' (or 'dataset_to_obfuscate') "
+                "and 'pii_fields'"
+            )
 
         # 3. DEFINE org_source_key HERE (Move this outside of any conditional blocks)
         # Optional Logging for coudewatch clarity (ingestion_bucket, file_name)
@@ -69,6 +217,11 @@ def lambda_handler(event, context):
         org_source_key = parsed_url.path.lstrip("/")  # <-- 'new_data/test_data.csv'
         file_name = s3_source_path.split("/")[-1]  # <-- 'test_data.csv'
 
+        # Converted output gets the extension of its new format
+        dest_key = f"obfuscated/{org_source_key}"
+        if output_format:
+            dest_key = f"{dest_key.rsplit('.', 1)[0]}.{output_format.lower()}"
+
         # log ingestion bucket, key and file name
         logger.info(
             f"Processing ingestion_bucket: {ingestion_bucket},"
@@ -80,27 +233,98 @@ def lambda_handler(event, context):
         logger.info(f"Destination bucket: {dest_bucket}")
         logger.info(f"pii_fields to obfuscate: {pii_fields}")
 
+        # Integrity (row counts, non-PII checksums) is verified unless VERIFY_INTEGRITY=false
+        verify_integrity = os.environ.get("VERIFY_INTEGRITY", "true").lower() != "false"
+
+        # Memory budget of a file (eg 80% of memory_size) and the per-stage memory report
+        memory_budget_mb = os.environ.get("MEMORY_BUDGET_MB")
+        profile_memory = os.environ.get("PROFILE_MEMORY", "false").lower() == "true"
+
+        # Envelope encryption of the output with a data key of this KMS key (if configured)
+        kms_key_id = os.environ.get("KMS_KEY_ID") or None
+
+        # --- DATASET MODE: mirrored partition layout + manifest ---
+        if dataset_prefix:
+            logger.info(f"Call Obfuscator tool on dataset: {dataset_prefix}")
+            manifest = obfuscate_dataset(
+                dataset_prefix,
+                f"s3://{dest_bucket}/obfuscated/{org_source_key}",
+                pii_fields,
+                primary_key=primary_key or None,
+                s3_client=s3_client,
+                output_format=output_format or None,
+                compression=compression or None,
+                row_group_size=int(row_group_size) if row_group_size else None,
+                strategy=strategy,
+                vault=_get_token_vault() if strategy == "tokenize" else None,
+                verify_integrity=verify_integrity,
+                kms_key_id=kms_key_id,
+            )
+            return {
+                "status": 200,
+                "message": (
+                    f"Dataset {org_source_key} successfully obfuscated: "
+                    f"{len(manifest['partitions'])} partition(s), {manifest['rows']} rows."
+                ),
+                "manifest": f"{manifest['destination_prefix']}_manifest.json",
+            }
+
         # --- EXECUTE OBFUSCATOR LIBARY ---
         # Integration point: the handler calls the Obfuscator library.
-        # (Default primary_key=None for auto-detect)
+        # (primary_key=None for auto-detect)
         logger.info(f"Call Obfuscator tool on file: {s3_source_path}")
-        obfuscated_stream = obfuscate_data(s3_source_path, pii_fields, primary_key=None)
+        report = {}
+        # Encrypted outputs are streamed into a multipart upload while they are encrypted,
+        # no full-size plaintext or ciphertext copy is held in memory
+        destination = f"s3://{dest_bucket}/{dest_key}" if kms_key_id else None
+        obfuscated_stream = obfuscate_data(
+            s3_source_path,
+            pii_fields,
+            primary_key=primary_key or None,
+            output_format=output_format or None,
+            compression=compression or None,
+            row_group_size=int(row_group_size) if row_group_size else None,
+            strategy=strategy,
+            vault=_get_token_vault() if strategy == "tokenize" else None,
+            verify_integrity=verify_integrity,
+            report=report,
+            memory_budget_mb=float(memory_budget_mb) if memory_budget_mb else None,
+            profile_memory=profile_memory,
+            output=destination,
+            s3_client=s3_client,
+            kms_key_id=kms_key_id,
+        )
+
+        # Integrity result travels with the object as S3 metadata (x-amz-meta-*)
+        metadata = {}
+        if "integrity" in report:
+            metadata = {
+                "integrity-verified": str(report["integrity"]["verified"]).lower(),
+                "integrity-rows": str(report["integrity"]["rows_out"]),
+                "integrity-checksum": report["integrity"]["checksum"],
+            }
 
         # --- The LAMBDA HANDLER (calling procedure) SAVES THE DATA ---
-        s3_client.put_object(
-            Bucket=dest_bucket,
-            Key=f"obfuscated/{org_source_key}",  # <-- 'new_data/test_data.csv'
-            Body=obfuscated_stream.getvalue(),
-        )
+        # (encrypted outputs are already uploaded, the integrity is in the response)
+        if not destination:
+            s3_client.put_object(
+                Bucket=dest_bucket,
+                Key=dest_key,  # <-- 'obfuscated/new_data/test_data.csv'
+                Body=obfuscated_stream.getvalue(),
+                Metadata=metadata,
+            )
 
-        logger.info(
-            f"Successfully obfuscated and saved: s3://{dest_bucket}/obfuscated/{org_source_key}"
-        )
+        logger.info(f"Successfully obfuscated and saved: s3://{dest_bucket}/{dest_key}")
 
-        return {
+        response = {
             "status": 200,
             "message": f"File {org_source_key} successfully obfuscated and saved.",
         }
+        if "integrity" in report:
+            response["integrity"] = report["integrity"]
+        if "memory" in report:
+            response["memory"] = report["memory"]
+        return response
 
     except Exception as e:
         logger.error(f"Obfuscator Lambda Handler failed: {str(e)}")
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+
+import boto3
+
+from .obfuscator_lib import _output_key, obfuscate_data
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# ASYNC API
+# For asyncio services (eg the ingestion gateway): the event loop never blocks on S3 or on
+# the masking, so many files can be in flight next to the other work of the service.
+# ==========================================================
+def _split_s3_uri(s3_uri):
+    """Returns the (bucket, key) of an s3://bucket/key URI."""
+    parsed_url = urlparse(s3_uri)
+    return parsed_url.netloc, parsed_url.path.lstrip("/")
+
+
+async def obfuscate_data_async(
+    source,
+    pii_fields,
+    destination=None,
+    s3_client=None,
+    executor=None,
+    io_executor=None,
+    **options,
+):
+    """
+    Async variant of obfuscate_data.
+
+    The S3 download and upload run on the I/O executor, the CPU bound masking and
+    serialization on the executor, so the event loop is free while the file is processed.
+
+    Args:
+        source (str | bytes | ...): S3 URI (s3://bucket/new_data/file.csv) or any other
+            source obfuscate_data accepts.
+        pii_fields (list): List of the column names to be obfuscated [***].
+        destination (str, optional): S3 URI the obfuscated data is uploaded to.
+        s3_client (boto3.client, optional): S3 client for the download and upload.
+        executor (concurrent.futures.Executor, optional): Runs the masking. None for the
+            default executor of the loop. A ProcessPoolExecutor sidesteps the GIL, but then
+            `report` is not filled in and `vault` must be picklable.
+        io_executor (concurrent.futures.Executor, optional): Runs the S3 calls. None for
+            the default executor of the loop.
+        **options: Passed on to obfuscate_data (primary_key, file_format, output_format,
+            compression, row_group_size, chunksize, strategy, vault, verify_integrity,
+            report).
+
+    Returns:
+        BytesIO: Byte stream of the obfuscated data (also uploaded if destination is given).
+    """
+    try:
+        loop = asyncio.get_running_loop()
+
+        # 1. --- NON-BLOCKING DOWNLOAD ---
+        # S3 objects are read into memory first, the masking then works on the buffer
+        if isinstance(source, str) and source.startswith("s3://"):
+            s3_client = s3_client or boto3.client("s3")
+            bucket, key = _split_s3_uri(source)
+            options.setdefault("file_format", key.split(".")[-1].lower())
+            response = await loop.run_in_executor(
+                io_executor, partial(s3_client.get_object, Bucket=bucket, Key=key)
+            )
+            source = await loop.run_in_executor(io_executor, response["Body"].read)
+
+        # 2. --- MASKING AND SERIALIZATION OFF THE LOOP ---
+        obfuscated_stream = await loop.run_in_executor(
+            executor, partial(obfuscate_data, source, pii_fields, **options)
+        )
+
+        # 3. --- NON-BLOCKING UPLOAD ---
+        if destination:
+            s3_client = s3_client or boto3.client("s3")
+            bucket, key = _split_s3_uri(destination)
+            await loop.run_in_executor(
+                io_executor,
+                partial(
+                    s3_client.put_object,
+                    Bucket=bucket,
+                    Key=key,
+                    Body=obfuscated_stream.getvalue(),
+                ),
+            )
+
+        return obfuscated_stream
+
+    # Error handling
+    except Exception as e:
+        logger.error(f"Error in obfuscate_data_async: {str(e)}")
+        raise
+
+
+async def obfuscate_many_async(
+    sources,
+    pii_fields,
+    destination_prefix,
+    max_in_flight=16,
+    s3_client=None,
+    executor=None,
+    io_executor=None,
+    **options,
+):
+    """
+    Obfuscates many S3 files concurrently, with at most `max_in_flight` files at a time.
+
+    Backpressure: the next source is only taken from `sources` once a slot is free, so
+    a long (or endless) iterator of files never holds more than `max_in_flight` files
+    in memory.
+
+    Args:
+        sources (iterable): S3 URIs of the files (s3://bucket/new_data/file.csv).
+        pii_fields (list): List of the column names to be obfuscated [***].
+        destination_prefix (str): S3 prefix of the output, the source key is appended
+            (s3://dest/obfuscated/ -> s3://dest/obfuscated/new_data/file.csv).
+        max_in_flight (int): Files processed concurrently.
+        s3_client, executor, io_executor, **options: See obfuscate_data_async.
+
+    Returns:
+        list: One result per source, in order: {'source', 'destination', 'rows', 'seconds'}.
+
+    Raises:
+        Exception: files failed, after every other file has been processed
+    """
+    s3_client = s3_client or boto3.client("s3")
+    destination_prefix = destination_prefix.rstrip("/") + "/"
+    slots = asyncio.Semaphore(max_in_flight)
+    owns_io_executor = io_executor is None
+    if owns_io_executor:
+        # one S3 call per file in flight, the default executor may be smaller than that
+        io_executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    async def process_file(source):
+        try:
+            start_time = time.perf_counter()
+            report = {}
+            destination = destination_prefix + _output_key(
+                _split_s3_uri(source)[1], options.get("output_format")
+            )
+            await obfuscate_data_async(
+                source,
+                pii_fields,
+                destination=destination,
+                s3_client=s3_client,
+                executor=executor,
+                io_executor=io_executor,
+                report=report,
+                **options,
+            )
+            return {
+                "source": source,
+                "destination": destination,
+                "rows": report.get("rows"),
+                "seconds": time.perf_counter() - start_time,
+            }
+        finally:
+            slots.release()
+
+    try:
+        submitted, tasks = [], []
+        for source in sources:
+            await slots.acquire()
+            submitted.append(source)
+            tasks.append(asyncio.create_task(process_file(source)))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if owns_io_executor:
+            io_executor.shutdown(wait=False)
+
+    failed = []
+    for source, result in zip(submitted, results):
+        if isinstance(result, Exception):
+            logger.error(f"File {source} failed: {str(result)}")
+            failed.append(source)
+    if failed:
+        raise Exception(f"{len(failed)} file(s) failed: {failed}")
+    return results
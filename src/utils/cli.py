@@ -0,0 +1,239 @@
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .format_engines import get_engine, supported_extensions
+from .obfuscator_lib import obfuscate_data
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# extensions of the registered format engines (.csv, .json, .parquet, .pq, .orc)
+SUPPORTED_EXTENSIONS = supported_extensions()
+
+
+# ==========================================================
+# LOCAL CLI (CALLING PROCEDURE)
+# Obfuscates directories of local files without S3, eg for on-prem and batch jobs:
+# python -m utils.cli "data/raw/*.csv" --pii-fields name,email_address --output-dir data/out
+# ==========================================================
+def _collect_files(inputs):
+    """
+    Expands directories (recursively) and glob patterns into (file_path, relative_path) pairs.
+
+    The relative path mirrors the input layout below the output directory: relative to
+    the directory itself, or to the non-wildcard root of a glob pattern (data/*/part.csv
+    -> 2024/part.csv, 2025/part.csv), so files of the same name do not overwrite each other.
+
+    Raises:
+        ValueError: two input files map to the same output path
+    """
+    files = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                for name in sorted(names):
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        files.append((path, os.path.relpath(path, pattern)))
+        else:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS):
+                    files.append((path, os.path.relpath(path, _glob_root(pattern))))
+
+    # the output paths are checked before any worker starts,
+    # a file matched by several inputs is obfuscated once
+    outputs = {}
+    for path, relative_path in files:
+        other = outputs.setdefault(os.path.normpath(relative_path), path)
+        if os.path.abspath(other) != os.path.abspath(path):
+            raise ValueError(
+                f"{other} and {path} would both be written to {relative_path}"
+            )
+    return [(path, relative_path) for relative_path, path in outputs.items()]
+
+
+def _glob_root(pattern):
+    """The leading directories of a glob pattern without wildcards ('.' if none)."""
+    root = os.path.dirname(pattern)
+    while glob.has_magic(root):
+        root = os.path.dirname(root)
+    return root or "."
+
+
+def _choose_engine(file_path, streaming_threshold_bytes):
+    """Large chunkable files go to the streaming engine, anything else is loaded in-memory."""
+    engine = get_engine(file_path.split(".")[-1])
+    if engine.chunkable and os.path.getsize(file_path) > streaming_threshold_bytes:
+        return "streaming"
+    return "in-memory"
+
+
+def _obfuscate_local_file(
+    file_path, output_path, pii_fields, primary_key, engine, chunksize
+):
+    """Process pool worker: obfuscates one file and returns its throughput record."""
+    start_time = time.perf_counter()
+    output_dir, output_name = os.path.split(output_path)
+    os.makedirs(output_dir or ".", exist_ok=True)
+
+    # written next to the output and renamed once complete,
+    # a file that fails mid-stream leaves no truncated output behind
+    temp_path = os.path.join(output_dir, f".{output_name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "wb") as output_file:
+            obfuscate_data(
+                file_path,
+                pii_fields,
+                primary_key=primary_key,
+                chunksize=chunksize if engine == "streaming" else None,
+                output=output_file,
+            )
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return {
+        "file": file_path,
+        "engine": engine,
+        "bytes_in": os.path.getsize(file_path),
+        "bytes_out": os.path.getsize(output_path),
+        "seconds": time.perf_counter() - start_time,
+    }
+
+
+def _throughput(size_bytes, seconds):
+    """MB/s, guarded against zero durations of tiny files."""
+    return size_bytes / (1024 * 1024) / max(seconds, 1e-9)
+
+
+def run(
+    inputs,
+    pii_fields,
+    output_dir,
+    primary_key=None,
+    workers=None,
+    chunksize=100_000,
+    streaming_threshold_mb=64,
+):
+    """
+    Obfuscates local files in a process pool and returns the per-file results.
+
+    Args:
+        inputs (list): Local directories and/or glob patterns.
+        pii_fields (list): List of the column names to be obfuscated [***].
+        output_dir (str): Output directory, the input layout is mirrored below it.
+        primary_key (str, optional): Primary key column name. None for auto-detect.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        chunksize (int): Rows per chunk for the streaming engine.
+        streaming_threshold_mb (float): Files above this size use the streaming engine.
+
+    Returns:
+        list: One dict per file (file, engine, bytes_in, bytes_out, seconds | error).
+    """
+    files = _collect_files(inputs)
+    if not files:
+        raise ValueError(f"No supported files found in: {inputs}")
+
+    threshold_bytes = streaming_threshold_mb * 1024 * 1024
+    results = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                _obfuscate_local_file,
+                file_path,
+                os.path.join(output_dir, relative_path),
+                pii_fields,
+                primary_key,
+                _choose_engine(file_path, threshold_bytes),
+                chunksize,
+            ): file_path
+            for file_path, relative_path in files
+        }
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Error obfuscating {futures[future]}: {str(e)}")
+                results.append({"file": futures[future], "error": str(e)})
+
+    return results
+
+
+def _print_summary(results, wall_seconds):
+    """Prints a per-file and an aggregate throughput summary."""
+    done = [r for r in results if "error" not in r]
+    for r in sorted(results, key=lambda r: r["file"]):
+        if "error" in r:
+            print(f"FAILED  {r['file']}: {r['error']}")
+        else:
+            print(
+                f"OK      {r['file']} [{r['engine']}] "
+                f"{r['bytes_in'] / (1024 * 1024):.2f} MB in {r['seconds']:.2f}s "
+                f"({_throughput(r['bytes_in'], r['seconds']):.2f} MB/s)"
+            )
+
+    total_bytes = sum(r["bytes_in"] for r in done)
+    print(
+        f"Total: {len(done)}/{len(results)} files, "
+        f"{total_bytes / (1024 * 1024):.2f} MB in {wall_seconds:.2f}s "
+        f"({_throughput(total_bytes, wall_seconds):.2f} MB/s)"
+    )
+
+
+def main(argv=None):
+    """Command line entry point, returns the process exit code."""
+    parser = argparse.ArgumentParser(
+        description="Obfuscate PII fields of local csv, json, parquet and orc files."
+    )
+    parser.add_argument("inputs", nargs="+", help="Directories and/or glob patterns.")
+    parser.add_argument(
+        "--pii-fields",
+        required=True,
+        help="Comma separated column names to obfuscate, eg name,email_address",
+    )
+    parser.add_argument("--output-dir", required=True, help="Output directory.")
+    parser.add_argument("--primary-key", default=None, help="Primary key column.")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPUs)."
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100_000,
+        help="Rows per chunk for the streaming engine.",
+    )
+    parser.add_argument(
+        "--streaming-threshold-mb",
+        type=float,
+        default=64,
+        help="Files larger than this are processed with the streaming engine.",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    start_time = time.perf_counter()
+    results = run(
+        args.inputs,
+        args.pii_fields.split(","),
+        args.output_dir,
+        primary_key=args.primary_key,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        streaming_threshold_mb=args.streaming_threshold_mb,
+    )
+    _print_summary(results, time.perf_counter() - start_time)
+
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
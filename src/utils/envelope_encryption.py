@@ -0,0 +1,223 @@
+from contextlib import nullcontext
+from io import BytesIO
+import base64
+import io
+import json
+import logging
+import os
+import struct
+
+import boto3
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # optional, only needed for encrypted outputs
+    AESGCM = None
+    InvalidTag = None
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GDPRENC1"
+ALGORITHM = "AES-256-GCM-SEGMENTED"
+# Plaintext bytes per segment, at most one segment is buffered by the encryptor
+SEGMENT_SIZE = 1024 * 1024
+TAG_SIZE = 16
+# 7 random bytes + 4 bytes segment index + 1 byte last segment flag = 12 bytes GCM nonce
+NONCE_PREFIX_SIZE = 7
+
+
+# ==========================================================
+# ENVELOPE ENCRYPTION
+# Every object gets its own data key from KMS, only the KMS encrypted copy of the key is
+# stored in the object header. The data is encrypted as a stream of AES-GCM segments:
+#
+#   MAGIC | header length (4 bytes) | header (json) | segment 0 | segment 1 | ...
+#
+# Every segment is authenticated on its own, with the header as associated data and
+# its index and a last segment flag in the nonce, so reordered, dropped or truncated
+# segments and a modified header fail the decryption.
+# ==========================================================
+def _require_cryptography():
+    if AESGCM is None:
+        raise ImportError(
+            "Envelope encryption requires the 'cryptography' package "
+            "(pip install cryptography)."
+        )
+
+
+def _segment_nonce(nonce_prefix, index, last):
+    return nonce_prefix + struct.pack(">I?", index, last)
+
+
+class EnvelopeEncryptor(io.BufferedIOBase):
+    """
+    Encryption stage: a binary sink that encrypts the written bytes into `sink`.
+
+    The header goes to the sink right away, then every full segment as soon as more
+    data follows it (the last one is only known at `finish`). Memory stays at one
+    segment whatever the size of the output, and the data is encrypted in one pass.
+
+    Args:
+        sink (file-like): Binary sink of the encrypted stream, eg the multipart uploader.
+        key_id (str): KMS key (id, ARN or alias) the data key is generated under.
+        kms_client (boto3.client, optional): KMS client.
+        encryption_context (dict, optional): KMS encryption context, stored in the header.
+        segment_size (int, optional): Plaintext bytes per segment, default SEGMENT_SIZE.
+        stats (_StageStats, optional): Busy time and segment count of the encryption.
+    """
+
+    def __init__(
+        self,
+        sink,
+        key_id,
+        kms_client=None,
+        encryption_context=None,
+        segment_size=None,
+        stats=None,
+    ):
+        super().__init__()
+        _require_cryptography()
+        self.sink = sink
+        self.segment_size = segment_size or SEGMENT_SIZE
+        self.stats = stats
+        encryption_context = encryption_context or {}
+        data_key = (kms_client or boto3.client("kms")).generate_data_key(
+            KeyId=key_id, KeySpec="AES_256", EncryptionContext=encryption_context
+        )
+        self._aesgcm = AESGCM(data_key["Plaintext"])
+        self._nonce_prefix = os.urandom(NONCE_PREFIX_SIZE)
+        header = json.dumps(
+            {
+                "algorithm": ALGORITHM,
+                "key_id": data_key["KeyId"],
+                "encrypted_data_key": base64.b64encode(
+                    data_key["CiphertextBlob"]
+                ).decode("ascii"),
+                "encryption_context": encryption_context,
+                "nonce_prefix": base64.b64encode(self._nonce_prefix).decode("ascii"),
+                "segment_size": self.segment_size,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+        self._header = MAGIC + struct.pack(">I", len(header)) + header
+        self.key_id = data_key["KeyId"]
+        self._buffer = bytearray()
+        self._position = 0
+        self._segment_index = 0
+        self.sink.write(self._header)
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        # position in the plaintext stream, as the writers see it
+        return self._position
+
+    def write(self, data):
+        view = memoryview(data).cast("B")
+        self._buffer += view
+        self._position += view.nbytes
+        # a full segment is only encrypted once more data follows it
+        while len(self._buffer) > self.segment_size:
+            self._encrypt_segment(bytes(self._buffer[: self.segment_size]), last=False)
+            del self._buffer[: self.segment_size]
+        return view.nbytes
+
+    def _encrypt_segment(self, plaintext, last):
+        nonce = _segment_nonce(self._nonce_prefix, self._segment_index, last)
+        with self.stats.measure() if self.stats else nullcontext():
+            ciphertext = self._aesgcm.encrypt(nonce, plaintext, self._header)
+        # the sink write (eg an inline part upload) is not part of the encryption time
+        self.sink.write(ciphertext)
+        self._segment_index += 1
+        if self.stats:
+            self.stats.items += 1
+
+    def finish(self):
+        """Encrypts the rest of the buffer as the last segment."""
+        self._encrypt_segment(bytes(self._buffer), last=True)
+        self._buffer = bytearray()
+        logger.info(
+            f"Envelope encrypted {self._position} bytes in {self._segment_index} "
+            f"segment(s) with a data key of {self.key_id}"
+        )
+
+
+def _read_exact(source, size):
+    """Reads `size` bytes, less only at the end of the stream."""
+    chunks = []
+    while size:
+        chunk = source.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def decrypt_data(source, kms_client=None, output=None):
+    """
+    Decrypts an envelope encrypted object segment by segment.
+
+    Args:
+        source (bytes | file-like): The encrypted data, eg the Body of an S3 object.
+        kms_client (boto3.client, optional): KMS client to decrypt the data key.
+        output (file-like, optional): Binary sink to write into. Defaults to a new BytesIO.
+
+    Returns:
+        BytesIO: The decrypted data (or the given `output`).
+
+    Raises:
+        ImportError: the 'cryptography' package is not installed
+        ValueError: not an envelope encrypted object
+        ValueError: the data failed authentication (modified or truncated)
+    """
+    _require_cryptography()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+
+    if _read_exact(source, len(MAGIC)) != MAGIC:
+        raise ValueError("Not an envelope encrypted object.")
+    header_length = struct.unpack(">I", _read_exact(source, 4))[0]
+    header_bytes = _read_exact(source, header_length)
+    header = json.loads(header_bytes)
+    if header.get("algorithm") != ALGORITHM:
+        raise ValueError(f"Unsupported algorithm: {header.get('algorithm')}")
+    associated_data = MAGIC + struct.pack(">I", header_length) + header_bytes
+
+    data_key = (kms_client or boto3.client("kms")).decrypt(
+        CiphertextBlob=base64.b64decode(header["encrypted_data_key"]),
+        EncryptionContext=header["encryption_context"],
+    )["Plaintext"]
+    aesgcm = AESGCM(data_key)
+    nonce_prefix = base64.b64decode(header["nonce_prefix"])
+    block_size = header["segment_size"] + TAG_SIZE
+
+    output_buffer = output if output is not None else BytesIO()
+    index = 0
+    current = _read_exact(source, block_size)
+    while True:
+        # one segment read ahead tells whether the current one is the last
+        following = _read_exact(source, block_size)
+        last = not following
+        try:
+            output_buffer.write(
+                aesgcm.decrypt(
+                    _segment_nonce(nonce_prefix, index, last), current, associated_data
+                )
+            )
+        except InvalidTag:
+            raise ValueError(
+                f"Encrypted data failed authentication at segment {index} "
+                f"(modified or truncated)."
+            )
+        if last:
+            break
+        current = following
+        index += 1
+
+    if output is None:
+        output_buffer.seek(0)
+    return output_buffer
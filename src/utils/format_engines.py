@@ -0,0 +1,773 @@
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import io
+import json
+import logging
+
+import awswrangler as wr
+import boto3
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import pyarrow.orc as orc
+except ImportError:  # pyarrow built without ORC support
+    orc = None
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Rows a csv schema probe reads to infer the column types
+PROBE_ROWS = 1_000
+
+
+# ==========================================================
+# FORMAT ENGINES
+# Every file format is handled by an engine: a streaming reader, a writer, a schema
+# probe and the capabilities the obfuscator plans the run with. Engines are looked up
+# by format name or file extension, or detected by the magic bytes of the source.
+# ==========================================================
+class FormatEngine:
+    """
+    Base class of the format engines.
+
+    Engines implement `read`, `probe_schema` and `open_writer`. Chunkable engines
+    also implement `iter_chunks`, Arrow native engines `iter_tables`. Writers call
+    `on_write` with every chunk in the form they serialize it (the csv fields, the
+    Arrow table), the integrity check compares it with the input through
+    `integrity_values`. Nothing is parsed back, so the check costs one hashing pass.
+
+    Capabilities:
+        chunkable: the source can be read chunk by chunk (streaming engine).
+        splittable: parts of a file (row groups, stripes) can be read on their own,
+            so one file can be split between workers.
+        column_projection: columns that are not needed are not decoded at all.
+        arrow_native: reads and writes pyarrow Tables, which enables the Arrow
+            passthrough of the obfuscator (no pandas conversion).
+        text_native: reads the values as their source text (`as_text`), so between
+            text native formats the untouched values are copied exactly (no type
+            inference, eg an int column with empty fields does not become float).
+    """
+
+    name = None
+    extensions = ()
+    # leading bytes of the files, used when the format can not be told from a name
+    magic = None
+    chunkable = False
+    splittable = False
+    column_projection = False
+    arrow_native = False
+    text_native = False
+    # in-memory size of a DataFrame per byte of the file (memory budget estimate)
+    memory_expansion = 4
+
+    def matches(self, head):
+        """True if `head` (the first bytes of a source) is a file of this format."""
+        return bool(self.magic) and head.startswith(self.magic)
+
+    def read(self, reader_input, is_s3):
+        """Loads the whole source into a DataFrame (in-memory engine)."""
+        raise NotImplementedError
+
+    def iter_chunks(self, reader_input, is_s3, chunksize):
+        """
+        Yields DataFrames of at most `chunksize` rows (streaming engine).
+
+        A callable `chunksize` is asked before every chunk (adaptive chunk size).
+        """
+        raise NotImplementedError(f"The {self.name} engine is not chunkable.")
+
+    def probe_schema(self, reader_input, is_s3, s3_client=None):
+        """Returns the pyarrow schema of the source, reading as little of it as possible."""
+        raise NotImplementedError
+
+    def open_writer(
+        self,
+        sink,
+        compression=None,
+        row_group_size=None,
+        on_write=None,
+        max_buffer_bytes=None,
+    ):
+        """
+        Returns a writer that appends DataFrames (or Tables) to `sink` as one file.
+
+        `on_write` is called with every chunk as it was written, as a DataFrame or Table.
+        Writers that buffer chunks (parquet row groups) hold at most `max_buffer_bytes`.
+        """
+        raise NotImplementedError
+
+    def integrity_values(self, frame, columns):
+        """
+        The values of `columns` as this format stores them, in a form the integrity
+        check hashes: {column: Series}. Numbers are compared as float64, so a column
+        the writer casts from int to double (a later chunk with nulls) still matches.
+        """
+        return {col: _comparable(_column(frame, col)) for col in columns}
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "extensions": list(self.extensions),
+            "chunkable": self.chunkable,
+            "splittable": self.splittable,
+            "column_projection": self.column_projection,
+            "arrow_native": self.arrow_native,
+            "text_native": self.text_native,
+        }
+
+
+def _column(frame, col):
+    """One column of a DataFrame or of a pyarrow Table as a Series."""
+    return frame.column(col).to_pandas() if isinstance(frame, pa.Table) else frame[col]
+
+
+def _is_text(values):
+    """True for columns of strings (and nulls)."""
+    return pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty")
+
+
+def _comparable(values):
+    """Numbers as float64, nested values (json objects, lists) as their text."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype("float64")
+    if values.dtype == object and not _is_text(values):
+        return values.astype(str).where(values.notna(), None)
+    return values
+
+
+def _with_string_columns(schema, columns):
+    """
+    The schema with `columns` turned into strings (masked or skipped PII columns).
+
+    Their entries in the pandas metadata are rewritten as well, otherwise pandas reads
+    the output back with the dtype they had before (eg Int64) and fails.
+    """
+    fields = [
+        pa.field(field.name, pa.string()) if field.name in columns else field
+        for field in schema
+    ]
+    metadata = dict(schema.metadata or {})
+    if b"pandas" in metadata:
+        pandas_metadata = json.loads(metadata[b"pandas"])
+        for entry in pandas_metadata.get("columns", []):
+            if entry.get("field_name") in columns:
+                entry.update(pandas_type="unicode", numpy_type="object", metadata=None)
+        metadata[b"pandas"] = json.dumps(pandas_metadata).encode("utf-8")
+    return pa.schema(fields, metadata=metadata or None)
+
+
+@contextmanager
+def _keep_position(reader_input):
+    """Restores the position of a seekable source after peeking into it."""
+    position = None
+    if hasattr(reader_input, "seek") and hasattr(reader_input, "tell"):
+        position = reader_input.tell()
+    try:
+        yield
+    finally:
+        if position is not None:
+            reader_input.seek(position)
+
+
+def _rechunk(frames, chunksize):
+    """
+    Cuts chunks read at a fixed size into chunks of the current (adaptive) size.
+
+    Bigger chunks are sliced and smaller ones are joined, so the adaptive size can grow
+    above the size the reader was opened with. Only the last chunk may be smaller.
+    """
+    pieces = []
+    pending = 0
+    rows = chunksize()
+    for frame in frames:
+        start = 0
+        while start < len(frame):
+            take = min(rows - pending, len(frame) - start)
+            if isinstance(frame, pa.Table):
+                pieces.append(frame.slice(start, take))
+            else:
+                pieces.append(frame.iloc[start : start + take])  # noqa: E203
+            pending += take
+            start += take
+            if pending == rows:
+                yield _join(pieces)
+                pieces = []
+                pending = 0
+                rows = chunksize()
+    if pieces:
+        yield _join(pieces)
+
+
+def _join(pieces):
+    """One Table (zero-copy) or DataFrame (a copy, the read chunks are released)."""
+    if isinstance(pieces[0], pa.Table):
+        return pa.concat_tables(pieces) if len(pieces) > 1 else pieces[0]
+    return pd.concat(pieces) if len(pieces) > 1 else pieces[0].copy()
+
+
+def _fetch_s3_object(s3_uri, s3_client=None):
+    """Reads an S3 object into memory, for readers that need a seekable source."""
+    parsed_url = urlparse(s3_uri)
+    response = (s3_client or boto3.client("s3")).get_object(
+        Bucket=parsed_url.netloc, Key=parsed_url.path.lstrip("/")
+    )
+    return pa.BufferReader(response["Body"].read())
+
+
+class _S3RangeReader(io.RawIOBase):
+    """
+    Seekable, read-only view of an S3 object where every read is a ranged GET.
+
+    Schema probes of footer based formats (parquet, orc) only fetch the footer
+    instead of downloading the whole object.
+    """
+
+    def __init__(self, s3_uri, s3_client=None):
+        parsed_url = urlparse(s3_uri)
+        self.bucket = parsed_url.netloc
+        self.key = parsed_url.path.lstrip("/")
+        self.s3_client = s3_client or boto3.client("s3")
+        self.size = self.s3_client.head_object(Bucket=self.bucket, Key=self.key)[
+            "ContentLength"
+        ]
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.size}
+        self.position = max(0, base[whence] + offset)
+        return self.position
+
+    def readinto(self, buffer):
+        end = min(self.position + len(buffer), self.size)
+        if end <= self.position:
+            return 0
+        body = self.s3_client.get_object(
+            Bucket=self.bucket, Key=self.key, Range=f"bytes={self.position}-{end - 1}"
+        )["Body"].read()
+        buffer[: len(body)] = body
+        self.position += len(body)
+        return len(body)
+
+
+# ---- CSV ----
+def _csv_fields(frame):
+    """
+    The fields of a DataFrame as csv text: strings as they are, other values formatted
+    the way DataFrame.to_csv formats them, nulls (written as '') as None.
+    """
+    fields = {}
+    for col in frame.columns:
+        values = frame[col]
+        if not _is_text(values):
+            values = values.astype(str).where(values.notna(), None)
+        fields[col] = values
+    return pd.DataFrame(fields, columns=frame.columns, copy=False)
+
+
+class _CsvWriter:
+    """
+    Every chunk is serialized in memory. With `on_write` the values are formatted as
+    csv fields first, the writer writes those and `on_write` gets the same fields.
+    """
+
+    def __init__(self, sink, sep=",", on_write=None):
+        self.sink = sink
+        self.sep = sep
+        self.on_write = on_write
+        self._chunks_written = 0
+
+    def write(self, df):
+        # header only in front of the first chunk
+        header = self._chunks_written == 0
+        if self.on_write is not None:
+            df = self._format(df)
+        self.sink.write(self._serialize(df, header).encode("utf-8"))
+        if self.on_write is not None:
+            self.on_write(df)
+        self._chunks_written += 1
+
+    def _format(self, df):
+        return _csv_fields(df)
+
+    def _serialize(self, df, header):
+        return df.to_csv(index=False, sep=self.sep, header=header)
+
+    def close(self):
+        pass
+
+
+class CsvEngine(FormatEngine):
+    """Delimited text through pandas (awswrangler for S3), `sep` for other delimiters."""
+
+    name = "csv"
+    extensions = ("csv",)
+    sep = ","
+    chunkable = True
+    text_native = True
+
+    def _read_options(self, as_text):
+        if as_text:
+            # the source text of every field, only empty fields are null
+            return {
+                "sep": self.sep,
+                "dtype": str,
+                "keep_default_na": False,
+                "na_values": [""],
+            }
+        return {"sep": self.sep}
+
+    def read(self, reader_input, is_s3, as_text=False):
+        if is_s3:
+            return wr.s3.read_csv(reader_input, **self._read_options(as_text))
+        return pd.read_csv(reader_input, **self._read_options(as_text))
+
+    def iter_chunks(self, reader_input, is_s3, chunksize, as_text=False):
+        options = self._read_options(as_text)
+        if callable(chunksize) and not is_s3:
+            with pd.read_csv(reader_input, iterator=True, **options) as csv_reader:
+                while True:
+                    try:
+                        yield csv_reader.get_chunk(chunksize())
+                    except StopIteration:
+                        return
+        if callable(chunksize):
+            # read in chunks of the initial size, cut to the current size
+            frames = wr.s3.read_csv(reader_input, chunksize=chunksize(), **options)
+            yield from _rechunk(frames, chunksize)
+        elif is_s3:
+            yield from wr.s3.read_csv(reader_input, chunksize=chunksize, **options)
+        else:
+            yield from pd.read_csv(reader_input, chunksize=chunksize, **options)
+
+    def probe_schema(self, reader_input, is_s3, s3_client=None):
+        # the header and the first rows are enough to tell the columns and their types
+        if is_s3:
+            df = wr.s3.read_csv(reader_input, sep=self.sep, nrows=PROBE_ROWS)
+        else:
+            with _keep_position(reader_input):
+                df = pd.read_csv(reader_input, sep=self.sep, nrows=PROBE_ROWS)
+        return pa.Schema.from_pandas(df, preserve_index=False)
+
+    def open_writer(
+        self,
+        sink,
+        compression=None,
+        row_group_size=None,
+        on_write=None,
+        max_buffer_bytes=None,
+    ):
+        return _CsvWriter(sink, sep=self.sep, on_write=on_write)
+
+    def integrity_values(self, frame, columns):
+        """The values as csv fields, as the writer formats them (`_csv_fields`)."""
+        return dict(_csv_fields(frame[columns]).items())
+
+
+# ---- JSON ----
+class _JsonWriter:
+    """Records array, the chunks are joined into a single '[...]' document."""
+
+    def __init__(self, sink, on_write=None):
+        self.sink = sink
+        self.on_write = on_write
+        self._chunks_written = 0
+
+    def write(self, df):
+        records = df.to_json(orient="records", date_format="iso")[1:-1]
+        if records:
+            prefix = "[" if self._chunks_written == 0 else ","
+            self.sink.write((prefix + records).encode("utf-8"))
+            self._chunks_written += 1
+            if self.on_write is not None:
+                self.on_write(df)
+
+    def close(self):
+        self.sink.write(b"]" if self._chunks_written else b"[]")
+
+
+class JsonEngine(FormatEngine):
+    """JSON records arrays, always loaded whole (not chunkable)."""
+
+    name = "json"
+    extensions = ("json",)
+
+    def matches(self, head):
+        return head.lstrip()[:1] in (b"[", b"{")
+
+    def read(self, reader_input, is_s3):
+        # important: orient="records" to match the json lines format
+        if is_s3:
+            return wr.s3.read_json(reader_input, orient="records")
+        return pd.read_json(reader_input, orient="records")
+
+    def probe_schema(self, reader_input, is_s3, s3_client=None):
+        with _keep_position(reader_input):
+            df = self.read(reader_input, is_s3)
+        return pa.Schema.from_pandas(df, preserve_index=False)
+
+    def open_writer(
+        self,
+        sink,
+        compression=None,
+        row_group_size=None,
+        on_write=None,
+        max_buffer_bytes=None,
+    ):
+        return _JsonWriter(sink, on_write=on_write)
+
+
+# ---- ARROW NATIVE (PARQUET, ORC) ----
+class _ArrowWriter:
+    """
+    Writes DataFrames or pyarrow Tables, later chunks follow the schema of the first
+    one (eg int -> float on NaN). Subclasses open the file writer and write tables.
+    """
+
+    def __init__(self, sink, compression=None, on_write=None):
+        self.sink = sink
+        self.compression = compression
+        self.on_write = on_write
+        self._writer = None
+        self._schema = None
+
+    def write(self, frame):
+        table = self._to_table(frame)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._open(table.schema)
+        if self.on_write is not None:
+            self.on_write(table)
+        self._write(table)
+
+    def _to_table(self, frame):
+        if isinstance(frame, pa.Table):
+            # Arrow passthrough path
+            if self._schema is not None and frame.schema != self._schema:
+                return frame.cast(self._schema)
+            return frame
+        return pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+
+    def _open(self, schema):
+        raise NotImplementedError
+
+    def _write(self, table):
+        self._writer.write(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _ParquetWriter(_ArrowWriter):
+    """
+    Parquet output is dictionary encoded, so the masked ('***') columns shrink to a
+    single dictionary entry per row group. Chunks smaller than `row_group_size` are
+    buffered and written together, so the row groups reach the target size in
+    streaming mode as well. With `max_buffer_bytes` (a memory budget) the buffer is
+    written out as soon as it takes that much, in smaller row groups.
+    """
+
+    def __init__(
+        self,
+        sink,
+        compression=None,
+        row_group_size=None,
+        on_write=None,
+        max_buffer_bytes=None,
+    ):
+        super().__init__(sink, compression or "snappy", on_write)
+        self.row_group_size = row_group_size
+        self.max_buffer_bytes = max_buffer_bytes
+        self._pending_tables = []
+        self._pending_rows = 0
+        self._pending_bytes = 0
+
+    def _open(self, schema):
+        return pq.ParquetWriter(
+            self.sink, schema, compression=self.compression, use_dictionary=True
+        )
+
+    def _write(self, table):
+        self._pending_tables.append(table)
+        self._pending_rows += table.num_rows
+        self._pending_bytes += table.nbytes
+        if (
+            not self.row_group_size
+            or self._pending_rows >= self.row_group_size
+            or (self.max_buffer_bytes and self._pending_bytes >= self.max_buffer_bytes)
+        ):
+            self._flush_row_groups()
+
+    def _flush_row_groups(self):
+        if self._pending_tables:
+            self._writer.write_table(
+                pa.concat_tables(self._pending_tables),
+                row_group_size=self.row_group_size,
+            )
+            self._pending_tables = []
+            self._pending_rows = 0
+            self._pending_bytes = 0
+
+    def close(self):
+        if self._writer is not None:
+            self._flush_row_groups()
+        super().close()
+
+
+class _OrcWriter(_ArrowWriter):
+    """Every chunk is appended to the open ORC file, stripes are cut by size."""
+
+    def __init__(self, sink, compression=None, on_write=None):
+        compression = {None: "snappy", "none": "uncompressed"}.get(
+            compression, compression
+        )
+        super().__init__(sink, compression, on_write)
+
+    def _open(self, schema):
+        return orc.ORCWriter(self.sink, compression=self.compression)
+
+
+class ArrowEngine(FormatEngine):
+    """
+    Base class of the columnar engines read through pyarrow.
+
+    Subclasses implement `_open` (the pyarrow file reader), `_read_table` and
+    `_iter_batches`. Columns stored for a pandas index are left out, as pandas
+    reads them back into the index and not as data columns.
+    """
+
+    chunkable = True
+    splittable = True
+    column_projection = True
+    arrow_native = True
+    memory_expansion = 8
+
+    def _open(self, reader_input):
+        raise NotImplementedError
+
+    def _read_table(self, source_file, columns):
+        raise NotImplementedError
+
+    def _iter_batches(self, source_file, batch_size, columns):
+        raise NotImplementedError
+
+    @staticmethod
+    def _data_schema(schema):
+        """The schema without the columns of a stored pandas index."""
+        index_columns = [
+            col
+            for col in (schema.pandas_metadata or {}).get("index_columns", [])
+            if isinstance(col, str)
+        ]
+        if not index_columns:
+            return schema
+        # the pandas metadata would refer to the dropped index columns
+        return pa.schema([field for field in schema if field.name not in index_columns])
+
+    def read(self, reader_input, is_s3):
+        if is_s3:
+            reader_input = _fetch_s3_object(reader_input)
+        return next(self.iter_tables(reader_input, False)).to_pandas()
+
+    def iter_chunks(self, reader_input, is_s3, chunksize):
+        for table in self.iter_tables(reader_input, is_s3, chunksize):
+            yield table.to_pandas()
+
+    def iter_tables(
+        self, reader_input, is_s3, chunksize=None, skip_columns=(), s3_client=None
+    ):
+        """
+        Yields the source as pyarrow Tables, one for the whole file without a chunksize.
+
+        The `skip_columns` (eg masked PII) are not read at all, they come as null string
+        columns in their original position for the masking to fill.
+        """
+        if is_s3:
+            # the readers need a seekable source, S3 objects are read into memory first
+            reader_input = _fetch_s3_object(reader_input, s3_client)
+
+        source_file = self._open(reader_input)
+        schema = self._data_schema(source_file.schema_arrow)
+        columns = [name for name in schema.names if name not in skip_columns]
+        layout = _with_string_columns(
+            schema, [name for name in schema.names if name not in columns]
+        )
+
+        def restore_layout(table):
+            if table.num_columns == len(layout):
+                return table
+            arrays = [
+                (
+                    table.column(name)
+                    if name in columns
+                    else pa.nulls(table.num_rows, pa.string())
+                )
+                for name in layout.names
+            ]
+            return pa.Table.from_arrays(arrays, schema=layout)
+
+        if not chunksize:
+            yield restore_layout(self._read_table(source_file, columns))
+            return
+
+        size = chunksize if callable(chunksize) else lambda: chunksize
+        tables = (
+            restore_layout(pa.Table.from_batches([batch]))
+            for batch in self._iter_batches(source_file, size(), columns)
+        )
+        # zero-copy slices and concatenations to the current chunk size
+        yield from _rechunk(tables, size)
+
+    def probe_schema(self, reader_input, is_s3, s3_client=None):
+        # only the footer is read, from S3 with ranged GETs
+        if is_s3:
+            reader_input = _S3RangeReader(reader_input, s3_client)
+        with _keep_position(reader_input):
+            return self._data_schema(self._open(reader_input).schema_arrow)
+
+
+class ParquetEngine(ArrowEngine):
+    """Parquet through pyarrow, S3 sources are streamed by awswrangler."""
+
+    name = "parquet"
+    extensions = ("parquet", "pq")
+    magic = b"PAR1"
+
+    def _open(self, reader_input):
+        return pq.ParquetFile(reader_input)
+
+    def _read_table(self, source_file, columns):
+        return source_file.read(columns=columns)
+
+    def _iter_batches(self, source_file, batch_size, columns):
+        return source_file.iter_batches(batch_size=batch_size, columns=columns)
+
+    def read(self, reader_input, is_s3):
+        if is_s3:
+            return wr.s3.read_parquet(reader_input)
+        return pd.read_parquet(reader_input)
+
+    def iter_chunks(self, reader_input, is_s3, chunksize):
+        if not is_s3:
+            yield from super().iter_chunks(reader_input, is_s3, chunksize)
+            return
+        # row group by row group, without reading the whole object into memory
+        initial = chunksize() if callable(chunksize) else chunksize
+        frames = wr.s3.read_parquet(reader_input, chunked=initial)
+        yield from _rechunk(frames, chunksize) if callable(chunksize) else frames
+
+    def open_writer(
+        self,
+        sink,
+        compression=None,
+        row_group_size=None,
+        on_write=None,
+        max_buffer_bytes=None,
+    ):
+        return _ParquetWriter(
+            sink, compression, row_group_size, on_write, max_buffer_bytes
+        )
+
+
+class _OrcFile:
+    """pyarrow.orc.ORCFile with the `schema_arrow` of pyarrow.parquet.ParquetFile."""
+
+    def __init__(self, reader_input):
+        self.orc_file = orc.ORCFile(reader_input)
+        self.schema_arrow = self.orc_file.schema
+
+
+class OrcEngine(ArrowEngine):
+    """ORC through pyarrow.orc, the chunks follow the stripes of the file."""
+
+    name = "orc"
+    extensions = ("orc",)
+    magic = b"ORC"
+
+    def _open(self, reader_input):
+        return _OrcFile(reader_input)
+
+    def _read_table(self, source_file, columns):
+        return source_file.orc_file.read(columns=columns)
+
+    def _iter_batches(self, source_file, batch_size, columns):
+        # stripes are the unit of an ORC read, they are cut to the chunk size
+        for stripe in range(source_file.orc_file.nstripes):
+            yield source_file.orc_file.read_stripe(stripe, columns=columns)
+
+    def open_writer(
+        self,
+        sink,
+        compression=None,
+        row_group_size=None,
+        on_write=None,
+        max_buffer_bytes=None,
+    ):
+        return _OrcWriter(sink, compression, on_write)
+
+
+# ==========================================================
+# ENGINE REGISTRY
+# ==========================================================
+_ENGINES = {}
+
+
+def register_engine(engine):
+    """
+    Registers the engine of a format, replacing the engine of the same name.
+
+    Args:
+        engine (FormatEngine): Engine instance, eg a faster csv engine or a new format.
+
+    Returns:
+        FormatEngine: The registered engine.
+    """
+    _ENGINES[engine.name] = engine
+    return engine
+
+
+def get_engine(file_format):
+    """Engine of a format name or file extension ('csv', '.pq'), None if unsupported."""
+    file_format = file_format.lower().lstrip(".")
+    if file_format in _ENGINES:
+        return _ENGINES[file_format]
+    for engine in _ENGINES.values():
+        if file_format in engine.extensions:
+            return engine
+    return None
+
+
+def detect_format(head):
+    """Format name from the first bytes of a source (magic bytes), None if unknown."""
+    for engine in _ENGINES.values():
+        if engine.matches(head):
+            return engine.name
+    return None
+
+
+def supported_formats():
+    """Names of the registered formats."""
+    return tuple(_ENGINES)
+
+
+def supported_extensions():
+    """File extensions of the registered formats ('.csv', '.json', ...)."""
+    return tuple(f".{ext}" for engine in _ENGINES.values() for ext in engine.extensions)
+
+
+register_engine(CsvEngine())
+register_engine(JsonEngine())
+register_engine(ParquetEngine())
+if orc is not None:
+    register_engine(OrcEngine())
@@ -1,137 +1,1341 @@
 import awswrangler as wr
+import boto3
+import hashlib
+import json
 import pandas as pd
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from io import BytesIO
+from urllib.parse import urlparse
+import io
 import logging
+import os
+import queue
+import sys
+import threading
+import time
+import tracemalloc
+
+from .envelope_encryption import EnvelopeEncryptor
+from .format_engines import _with_string_columns, detect_format, get_engine
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# Multipart upload parts of S3 outputs, S3 takes parts of at least 5 MiB (except the last)
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+MULTIPART_PART_SIZE_MIN = 5 * 1024 * 1024
+
+
+# ==========================================================
+# SOURCE RESOLUTION
+# The obfuscator accepts S3 URIs, local paths, in-memory buffers and file-like objects.
+# ==========================================================
+def _resolve_source(source, file_format=None):
+    """
+    Works out where the data comes from and which format it holds.
+
+    Buffers (bytes, bytearray, memoryview) are wrapped in a pyarrow BufferReader,
+    so they are parsed in place instead of being copied into a BytesIO first.
+
+    Args:
+        source (str | os.PathLike | bytes | bytearray | memoryview | file-like): Input data.
+        file_format (str, optional): Format name or extension of a registered engine
+            ('csv', 'json', 'parquet', 'orc'), overrides the file extension. Buffers and
+            unnamed file-like objects without one are detected by their magic bytes.
+
+    Returns:
+        tuple: (label, extension, reader_input, is_s3), label is used in logs and errors.
+
+    Raises:
+        TypeError: unsupported source type
+        ValueError: file format can not be determined
+    """
+    name = None
+    is_s3 = False
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        label = f"<in-memory {type(source).__name__}>"
+        reader_input = pa.BufferReader(pa.py_buffer(source))
+    elif isinstance(source, (str, os.PathLike)):
+        label = name = os.fspath(source)
+        reader_input = label
+        is_s3 = label.startswith("s3://")
+    elif hasattr(source, "read"):
+        if isinstance(getattr(source, "name", None), str):
+            name = source.name
+        label = f"<file-like {name or type(source).__name__}>"
+        reader_input = source
+    else:
+        raise TypeError(f"Unsupported source type: {type(source).__name__}")
+
+    if file_format:
+        extension = file_format.lower().lstrip(".")
+    elif name:
+        # Determine file extension s3_source_path = s3://bucket/folder/file.csv
+        extension = name.split(".")[-1].lower()  # <-- 'csv', 'json', 'parquet'
+    else:
+        extension = _sniff_format(reader_input)
+        if not extension:
+            raise ValueError(f"file_format must be given for {label}.")
+        logger.info(f"Detected format: {extension} of {label}")
+
+    return label, extension, reader_input, is_s3
+
+
+def _sniff_format(reader_input, head_size=16):
+    """Format of a buffer or seekable file-like object by its magic bytes, or None."""
+    if not (hasattr(reader_input, "seekable") and reader_input.seekable()):
+        return None
+    position = reader_input.tell()
+    head = reader_input.read(head_size)
+    reader_input.seek(position)
+    return detect_format(head) if isinstance(head, bytes) else None
+
+
+def _iter_frames(reader_input, engine, is_s3, chunksize=None, as_text=False):
+    """
+    Yields the source as DataFrames.
+
+    In-memory engine (chunksize=None or a non chunkable format): a single DataFrame.
+    Streaming engine: DataFrames of at most `chunksize` rows, so only one chunk is held in RAM
+    (plus the keys seen so far while an auto-detected primary key is checked across chunks).
+    A callable `chunksize` is asked before every chunk (adaptive, see _MemoryGovernor).
+    `as_text` reads the values as their source text (text native engines only).
+    """
+    options = {"as_text": True} if as_text else {}
+    if not chunksize or not engine.chunkable:
+        yield engine.read(reader_input, is_s3, **options)
+        return
+    yield from engine.iter_chunks(reader_input, is_s3, chunksize, **options)
+
+
+def _frame_columns(frame):
+    """Column names of a DataFrame or of a pyarrow Table (Arrow passthrough path)."""
+    return frame.column_names if isinstance(frame, pa.Table) else list(frame.columns)
+
+
+def _frame_column(frame, col):
+    """One column as a Series, of a Table only this column is converted to pandas."""
+    return frame.column(col).to_pandas() if isinstance(frame, pa.Table) else frame[col]
+
+
+def _frame_is_empty(frame):
+    return frame.num_rows == 0 if isinstance(frame, pa.Table) else frame.empty
+
+
+def _frame_nbytes(frame):
+    if isinstance(frame, pa.Table):
+        return frame.nbytes
+    return frame.memory_usage(deep=True).sum()
+
+
+# ==========================================================
+# PIPELINE STAGES
+# reader -> mask/serialize -> uploader, connected by bounded queues. With a pipeline depth
+# the reader and the uploader run in their own threads, so the network transfers overlap
+# with the masking and at most `depth` chunks / parts wait in each queue.
+# ==========================================================
+_END_OF_STREAM = object()
+
+
+class _StageStats:
+    """
+    Busy time and item count of one pipeline stage.
+
+    With `profile_memory` every measured step also records the peak of the traced
+    (tracemalloc) allocations during the step and the RSS of the process after it.
+    tracemalloc is process wide: steps that overlap (a pipeline depth, concurrent runs)
+    share one peak, which is only reset while no step runs, so the per-stage numbers
+    are an upper bound (they may include the allocations of the other stages).
+    """
+
+    def __init__(self, profile_memory=False):
+        self.busy_seconds = 0.0
+        self.items = 0
+        self.profile_memory = profile_memory
+        self.peak_traced_bytes = 0
+        self.peak_rss_bytes = 0
+
+    @contextmanager
+    def measure(self):
+        if self.profile_memory:
+            traced_before = _TRACING.begin_step()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.busy_seconds += time.perf_counter() - start_time
+            if self.profile_memory:
+                self.peak_traced_bytes = max(
+                    self.peak_traced_bytes, _TRACING.end_step() - traced_before
+                )
+                self.peak_rss_bytes = max(self.peak_rss_bytes, _current_rss_bytes())
+
+    def result(self, wall_seconds):
+        utilization = self.busy_seconds / wall_seconds if wall_seconds else 0.0
+        result = {
+            "busy_seconds": round(self.busy_seconds, 6),
+            "items": self.items,
+            "utilization": round(min(utilization, 1.0), 3),
+        }
+        if self.profile_memory:
+            result["peak_traced_mb"] = round(self.peak_traced_bytes / MB, 3)
+            result["peak_rss_mb"] = round(self.peak_rss_bytes / MB, 3)
+        return result
+
+
+class _StageError:
+    """Carries an exception of a stage thread over the queue."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _put_until(target_queue, item, stop):
+    """Blocking put on a bounded queue that gives up once `stop` is set."""
+    while not stop.is_set():
+        try:
+            target_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class _PrefetchReader:
+    """
+    Reader stage: iterates the chunks of the source.
+
+    With a `depth` a background thread reads ahead, up to `depth` chunks are queued
+    for the masking stage. Without one the chunks are read on demand.
+    """
+
+    def __init__(self, frames, depth=None, stats=None):
+        self.frames = frames
+        self.stats = stats or _StageStats()
+        self._queue = None
+        self._finished = False
+        if depth:
+            self._queue = queue.Queue(maxsize=depth)
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name="obfuscator-reader", daemon=True
+            )
+            self._thread.start()
+
+    def _read_next(self):
+        with self.stats.measure():
+            frame = next(self.frames, _END_OF_STREAM)
+        if frame is not _END_OF_STREAM:
+            self.stats.items += 1
+        return frame
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                frame = self._read_next()
+                if not _put_until(self._queue, frame, self._stop):
+                    return
+                if frame is _END_OF_STREAM:
+                    return
+        except Exception as e:
+            _put_until(self._queue, _StageError(e), self._stop)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        frame = self._read_next() if self._queue is None else self._queue.get()
+        if isinstance(frame, _StageError):
+            self._finished = True
+            raise frame.error
+        if frame is _END_OF_STREAM:
+            self._finished = True
+            raise StopIteration
+        return frame
+
+    def close(self):
+        """Stops the read-ahead thread (eg after a failure of the masking stage)."""
+        if self._queue is not None:
+            self._stop.set()
+            self._thread.join()
+
+
+class _MultipartUploader(io.BufferedIOBase):
+    """
+    Upload stage: a binary sink that uploads the written bytes as an S3 multipart upload.
+
+    Every `part_size` bytes become one part. With a `depth` the parts are uploaded by a
+    background thread and at most `depth` parts wait in the queue, a full queue blocks
+    the writer (backpressure). Without one each part is uploaded inline.
+    """
+
+    def __init__(
+        self, s3_client, s3_uri, part_size=MULTIPART_PART_SIZE, depth=None, stats=None
+    ):
+        super().__init__()
+        if part_size < MULTIPART_PART_SIZE_MIN:
+            raise ValueError(
+                f"part_size must be at least {MULTIPART_PART_SIZE_MIN} bytes (S3 minimum)"
+            )
+        parsed_url = urlparse(s3_uri)
+        self.s3_client = s3_client
+        self.bucket = parsed_url.netloc
+        self.key = parsed_url.path.lstrip("/")
+        self.part_size = part_size
+        self.stats = stats or _StageStats()
+        self.threaded = bool(depth)
+        self._buffer = bytearray()
+        self._position = 0
+        self._part_count = 0
+        self._parts = []
+        self._upload_id = s3_client.create_multipart_upload(
+            Bucket=self.bucket, Key=self.key
+        )["UploadId"]
+        if self.threaded:
+            self._queue = queue.Queue(maxsize=depth)
+            self._stop = threading.Event()
+            self._error = None
+            self._thread = threading.Thread(
+                target=self._run, name="obfuscator-uploader", daemon=True
+            )
+            self._thread.start()
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, data):
+        view = memoryview(data).cast("B")
+        self._buffer += view
+        self._position += view.nbytes
+        while len(self._buffer) >= self.part_size:
+            self._submit(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return view.nbytes
+
+    def _submit(self, body):
+        self._part_count += 1
+        if not self.threaded:
+            self._upload_part(self._part_count, body)
+            return
+        if self._error is not None:
+            raise self._error
+        _put_until(self._queue, (self._part_count, body), self._stop)
+
+    def _upload_part(self, part_number, body):
+        with self.stats.measure():
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+        self._parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+        self.stats.items += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _END_OF_STREAM:
+                return
+            if self._error is None and not self._stop.is_set():
+                try:
+                    self._upload_part(*item)
+                except Exception as e:
+                    # the writer sees it with its next part, the queue keeps draining
+                    self._error = e
+
+    def complete(self):
+        """Uploads the last (smaller) part and completes the multipart upload."""
+        if self._buffer or not self._part_count:
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+        if self.threaded:
+            _put_until(self._queue, _END_OF_STREAM, self._stop)
+            self._thread.join()
+            if self._error is not None:
+                raise self._error
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={
+                "Parts": sorted(self._parts, key=lambda part: part["PartNumber"])
+            },
+        )
+        logger.info(
+            f"Multipart upload completed: s3://{self.bucket}/{self.key}, "
+            f"{len(self._parts)} part(s)"
+        )
+
+    def abort(self):
+        """Stops the upload thread and aborts the multipart upload (no partial object)."""
+        if self.threaded:
+            # queued parts are skipped, the thread drains the queue and ends
+            self._stop.set()
+            self._queue.put(_END_OF_STREAM)
+            self._thread.join()
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+        except Exception as e:
+            logger.error(f"Abort of the multipart upload failed: {str(e)}")
+
+
+# ==========================================================
+# MEMORY PROFILING & BUDGET
+# Peak RSS / traced allocations per stage, and a memory budget that moves big files to the
+# streaming engine and shrinks the chunks, with a report to right-size the Lambda memory.
+# ==========================================================
+MB = 1024 * 1024
+
+# Share of the budget one chunk may take: read, masked copy, serialized output and queues
+CHUNK_BUDGET_SHARE = 0.1
+# RSS above this share of the budget halves the chunk size
+BUDGET_PRESSURE = 0.8
+MIN_CHUNKSIZE = 1_000
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class _Tracing:
+    """
+    Shares the process wide tracemalloc between the runs that profile memory.
+
+    Tracing is started by the first run and stopped when the last one ends (never if
+    something else started it), so a run that ends first (dataset threads, the async
+    executor) does not stop it under another one. The peak is reset at the start of a
+    measured step only if no other step is running, so overlapping steps keep theirs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._started = False
+        self._steps = 0
+
+    def start(self):
+        with self._lock:
+            if self._runs == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            self._runs += 1
+
+    def stop(self):
+        with self._lock:
+            self._runs -= 1
+            if self._runs == 0 and self._started:
+                tracemalloc.stop()
+                self._started = False
+
+    def begin_step(self):
+        """Returns the traced memory at the start of the step."""
+        with self._lock:
+            if self._steps == 0:
+                tracemalloc.reset_peak()
+            self._steps += 1
+            return tracemalloc.get_traced_memory()[0]
+
+    def end_step(self):
+        """Returns the traced peak since the oldest running step began."""
+        with self._lock:
+            self._steps -= 1
+            return tracemalloc.get_traced_memory()[1]
+
+
+_TRACING = _Tracing()
+
+
+def _peak_rss_bytes():
+    """Peak resident set size of the process (0 where the resource module is missing)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _current_rss_bytes():
+    """Current resident set size of the process, the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return _peak_rss_bytes()
+
+
+def _source_size(source, is_s3):
+    """Size of the source in bytes, None if it can not be told without reading it."""
+    try:
+        if isinstance(source, (bytes, bytearray)):
+            return len(source)
+        if isinstance(source, memoryview):
+            return source.nbytes
+        if is_s3:
+            return wr.s3.size_objects(source)[source]
+        if isinstance(source, (str, os.PathLike)):
+            return os.path.getsize(source)
+        if hasattr(source, "seek") and source.seekable():
+            position = source.tell()
+            size = source.seek(0, os.SEEK_END) - position
+            source.seek(position)
+            return size
+    except Exception as e:
+        logger.warning(f"Source size unknown: {str(e)}")
+    return None
+
+
+def _recommended_memory_size(peak_rss_bytes):
+    """Lambda memory_size (MB) for a peak: 25% headroom, rounded up to 64 MB, min 128."""
+    return min(10_240, max(128, -(-int(peak_rss_bytes * 1.25 / MB) // 64) * 64))
+
+
+def _memory_report(governor, stage_stats):
+    """
+    Memory report of a run, to right-size the Lambda `memory_size`.
+
+    'peak_rss_mb' is the peak of the whole process (what Lambda bills and kills on),
+    'recommended_memory_size_mb' adds 25% headroom to it.
+    """
+    peak_rss = _peak_rss_bytes()
+    memory = governor.result() if governor else {}
+    memory["peak_rss_mb"] = round(peak_rss / MB, 3)
+    traced = [stats.peak_traced_bytes for stats in stage_stats if stats.profile_memory]
+    if traced:
+        memory["peak_traced_mb"] = round(max(traced) / MB, 3)
+    if governor:
+        memory["within_budget"] = peak_rss <= governor.budget_bytes
+    memory["recommended_memory_size_mb"] = _recommended_memory_size(peak_rss)
+    return memory
+
+
+class _MemoryGovernor:
+    """
+    Keeps a run within a memory budget.
+
+    Before the read, a source whose estimated in-memory size does not fit in half of the
+    budget is moved from the in-memory engine to the streaming engine, its first chunk
+    (MIN_CHUNKSIZE rows) probes the size of a row. While streaming, the chunk size follows
+    CHUNK_BUDGET_SHARE of the budget (never above the requested chunk size), and the
+    ceiling is halved whenever the RSS of the process gets close to the budget.
+    The readers join or cut what they read to that size, so it can grow as well.
+    """
+
+    def __init__(self, budget_mb, chunksize=None):
+        self.budget_bytes = int(budget_mb * MB)
+        self.chunk_budget_bytes = int(self.budget_bytes * CHUNK_BUDGET_SHARE)
+        self.chunksize = chunksize
+        self.max_chunksize = chunksize
+        self.initial_chunksize = chunksize
+        self.switched_engine = False
+        self.adjustments = 0
+        # rows of the chunks actually read: the one before the last and the last
+        self.chunk_rows = (None, None)
+
+    def plan(self, engine, source_bytes):
+        """Returns the chunk size of the run: None (in-memory) or a callable."""
+        if not self.chunksize:
+            if not engine.chunkable or source_bytes is None:
+                if source_bytes is None:
+                    logger.warning(
+                        "Memory budget: source size unknown, in-memory engine"
+                    )
+                return None
+            # in-memory DataFrame size compared to the size in storage
+            estimate = source_bytes * engine.memory_expansion
+            if estimate <= self.budget_bytes / 2:
+                return None
+            self.switched_engine = True
+            self.max_chunksize = DEFAULT_CHUNKSIZE
+            self.chunksize = self.initial_chunksize = MIN_CHUNKSIZE
+            logger.info(
+                f"Memory budget: ~{estimate / MB:.0f} MB in memory does not fit in "
+                f"{self.budget_bytes / MB:.0f} MB, switched to the streaming engine"
+            )
+        return self.current_chunksize
+
+    def current_chunksize(self):
+        return self.chunksize
+
+    def observe(self, df):
+        """Sizes the next chunk by the memory the last one took."""
+        if not self.chunksize or _frame_is_empty(df):
+            return
+        self.chunk_rows = (self.chunk_rows[1], len(df))
+        chunk_bytes = _frame_nbytes(df)
+        rows = int(len(df) * self.chunk_budget_bytes / max(chunk_bytes, 1))
+        if _current_rss_bytes() > self.budget_bytes * BUDGET_PRESSURE:
+            self.max_chunksize = max(MIN_CHUNKSIZE, self.chunksize // 2)
+        rows = max(MIN_CHUNKSIZE, min(rows, self.max_chunksize))
+        if rows != self.chunksize:
+            logger.info(f"Memory budget: chunk size {self.chunksize} -> {rows} rows")
+            self.chunksize = rows
+            self.adjustments += 1
+
+    def final_chunksize(self):
+        """Rows of the last chunk read, the one before if the last is the smaller rest."""
+        previous, last = self.chunk_rows
+        if previous is not None and last < previous:
+            return previous
+        return last
+
+    def result(self):
+        return {
+            "budget_mb": round(self.budget_bytes / MB, 3),
+            "engine": "streaming" if self.chunksize else "in-memory",
+            "switched_engine": self.switched_engine,
+            "chunksize_initial": self.initial_chunksize,
+            "chunksize_final": self.final_chunksize(),
+            "chunk_adjustments": self.adjustments,
+        }
+
+
+# ==========================================================
+# PRIMARY KEY DETECTION
+# ==========================================================
+def _typed_text(values):
+    """The values of a column read as source text, typed as the csv reader types them."""
+    text = values.to_csv(index=False, header=False)
+    return pd.read_csv(io.StringIO(text), header=None, skip_blank_lines=False)[0]
+
+
+def _detect_primary_key(df, pii_fields, label, as_text=False):
+    """
+    Auto-detects the primary key column of the data.
+
+    Logic: unique, no null, equal length in all rows, consistent type/pattern.
+    The columns are checked in order and the first candidate wins (priority on
+    df.columns[0]), so on wide tables the scan stops at the first key-like column.
+    With `as_text` (a csv read as its source text) every checked column is typed
+    first, so the key does not depend on the output format.
+
+    Raises:
+        ValueError: no primary key detectable
+    """
+    for col in _frame_columns(df):
+        # pii fields are never a primary key (eg NIN, phone_number, email)
+        if col in pii_fields:
+            continue
+        values = _frame_column(df, col)
+        if as_text:
+            values = _typed_text(values)
+        if (
+            (
+                pd.api.types.is_string_dtype(values)
+                or pd.api.types.is_integer_dtype(values)
+            )
+            and values.is_unique
+            and not values.isnull().any()
+            and values.astype(str).map(len).nunique() == 1
+            # and not values.astype(str).str.contains(' ').any()
+        ):
+            return col
+
+    logger.error(
+        f"No primary key detected in {label}."
+        f"Data records must be supplied with primary key."
+    )
+    raise ValueError(
+        f"No primary key detected in {label}."
+        f"Data records must be supplied with primary key."
+    )
+
+
+# ==========================================================
+# OBFUSCATION STRATEGIES
+# mask: fixed '***' (irreversible), tokenize: vault tokens (reversible, see token_vault.py)
+# ==========================================================
+STRATEGIES = ("mask", "tokenize")
+MASK = "***"
+
+
+def _tokenize_series(series, col, vault):
+    """Tokens of one column chunk, one vault batch, nulls stay null."""
+    values = series.dropna().astype(str)
+    tokens = vault.tokenize_many(col, values.unique())
+    return values.map(tokens).reindex(series.index)
+
+
+def _obfuscate_frame(df, obf_pii_fields, strategy="mask", vault=None):
+    """
+    Obfuscates the PII columns of one DataFrame (chunk) in place.
+
+    Masking is one batch: the string columns are overwritten in place inside their
+    block, so a wide table is not split into a block per masked column (no new blocks,
+    no consolidation copies). Only other dtypes (eg int phone numbers) get new columns.
+    """
+    if strategy == "tokenize":
+        for col in obf_pii_fields:
+            df[col] = _tokenize_series(df[col], col, vault)
+        return
+
+    in_place = [
+        col for col in obf_pii_fields if pd.api.types.is_string_dtype(df[col].dtype)
+    ]
+    if in_place:
+        df.loc[:, in_place] = MASK
+    for col in obf_pii_fields:
+        if col not in in_place:
+            df[col] = MASK
+
+
+def _obfuscate_table(table, obf_pii_fields, strategy="mask", vault=None):
+    """
+    Obfuscates the PII columns of one pyarrow Table (Arrow passthrough path).
+
+    Returns a new Table that shares the buffers of every other column, they are not
+    copied or converted. The new columns are swapped in with one rebuild of the Table.
+    """
+    columns = table.columns
+    for col in obf_pii_fields:
+        i = table.schema.get_field_index(col)
+        if strategy == "tokenize":
+            series = _tokenize_series(table.column(i).to_pandas(), col, vault)
+            columns[i] = pa.array(series, type=pa.string(), from_pandas=True)
+        else:
+            columns[i] = pa.repeat(pa.scalar(MASK), table.num_rows)
+    return pa.Table.from_arrays(
+        columns, schema=_with_string_columns(table.schema, obf_pii_fields)
+    )
+
+
+# ==========================================================
+# INTEGRITY VERIFICATION
+# Computed while the chunks stream through, no second read of the output.
+# ==========================================================
+# row hash of a null, as hash_pandas_object(categorize=True) gives it
+NULL_ROW_HASH = 2**64 - 1
+
+
+class _IntegrityChecker:
+    """
+    Row counts, column order and rolling checksums of the untouched (non-PII) columns.
+
+    The read side is updated with every chunk as it comes from the reader (before
+    obfuscation), the write side by the writer with what it serializes: the csv fields
+    it formatted, the DataFrame of a json chunk, the Arrow table of parquet/orc. Both
+    sides are hashed in the representation of the output format (`integrity_values`
+    of its engine), so a value the writer changes does not match. Each
+    column checksum is a blake2b digest rolled over the vectorized row hashes of the
+    chunks, so it is order sensitive and costs one hashing pass per side.
+    """
+
+    def __init__(self, columns, untouched_columns, engine):
+        self.engine = engine
+        self.columns = list(columns)
+        self.untouched_columns = [
+            col for col in self.columns if col in untouched_columns
+        ]
+        self.rows = {"read": 0, "write": 0}
+        self.column_order_ok = {"read": True, "write": True}
+        self.checksums = {
+            side: {
+                col: hashlib.blake2b(digest_size=16) for col in self.untouched_columns
+            }
+            for side in ("read", "write")
+        }
+
+    def update(self, side, frame):
+        self.rows[side] += len(frame)
+        if _frame_columns(frame) != self.columns:
+            self.column_order_ok[side] = False
+            return
+        values = self.engine.integrity_values(frame, self.untouched_columns)
+        for col in self.untouched_columns:
+            # without categorize (a factorize pass that only pays off on repeated
+            # values), None and NaN hash differently: every null gets the null hash
+            row_hashes = pd.util.hash_pandas_object(
+                values[col], index=False, categorize=False
+            ).where(values[col].notna(), NULL_ROW_HASH)
+            self.checksums[side][col].update(row_hashes.to_numpy().tobytes())
+
+    def result(self):
+        """Returns the integrity report, 'verified' is False on any mismatch."""
+        read = {col: h.hexdigest() for col, h in self.checksums["read"].items()}
+        write = {col: h.hexdigest() for col, h in self.checksums["write"].items()}
+        mismatched = [col for col in self.untouched_columns if read[col] != write[col]]
+        # one digest over all the untouched columns, short enough for S3 metadata
+        digest = hashlib.blake2b(digest_size=16)
+        for col in self.untouched_columns:
+            digest.update(f"{col}={write[col]};".encode("utf-8"))
+        return {
+            "verified": self.rows["read"] == self.rows["write"]
+            and all(self.column_order_ok.values())
+            and not mismatched,
+            "rows_in": self.rows["read"],
+            "rows_out": self.rows["write"],
+            "columns": self.columns,
+            "column_order_ok": all(self.column_order_ok.values()),
+            "mismatched_columns": mismatched,
+            "checksums": write,
+            "checksum": digest.hexdigest(),
+        }
+
 
 # ==========================================================
 # OBFUSCATOR (LIBRARY MODULE)
 # Independent tool that can be called from any procedure, returns a byte stream.
 # ==========================================================
-def obfuscate_data(s3_source_path, pii_fields, primary_key=None):
+def obfuscate_data(
+    source,
+    pii_fields,
+    primary_key=None,
+    file_format=None,
+    chunksize=None,
+    output=None,
+    output_format=None,
+    compression=None,
+    row_group_size=None,
+    strategy="mask",
+    vault=None,
+    verify_integrity=False,
+    report=None,
+    pipeline_depth=None,
+    part_size=MULTIPART_PART_SIZE,
+    s3_client=None,
+    memory_budget_mb=None,
+    profile_memory=False,
+    kms_key_id=None,
+    kms_client=None,
+    encryption_context=None,
+):
     """
     General purpose Obfuscator|Pseudonymizator tool, which returns a byte stream.
     MVP: CSV files, Extended: json, parquet
 
     Args:
-        s3_source_path (str): S3 URI of source file (s3://source_bucket/new_data/test_data.csv)
+        source (str | os.PathLike | bytes | bytearray | memoryview | file-like):
+            S3 URI of source file (s3://source_bucket/new_data/test_data.csv), local file path,
+            in-memory buffer or binary file-like object holding the data.
         pii_fields (list): List of the column names to be obfuscated [***].
         primary_key (str, optional): Primary key column name. None for auto-detect.
+        file_format (str, optional): 'csv', 'json', 'parquet', 'orc' or any registered
+            format engine (see format_engines). Defaults to the file extension for paths,
+            buffers and file-like objects are detected by their magic bytes (not csv).
+        chunksize (int, optional): Rows per chunk for the streaming engine (chunkable
+            formats: csv, parquet, orc). None loads the whole file at once (in-memory engine).
+            An auto-detected primary key is checked for uniqueness across the chunks, which
+            keeps every key of the file in memory. A given `primary_key` is not checked.
+        output (file-like | str, optional): Binary sink to write into, eg an open local
+            file, or an S3 URI the output is streamed to as a multipart upload.
+            Defaults to a new BytesIO.
+        output_format (str, optional): 'csv', 'json', 'parquet' or 'orc' to convert the
+            output, eg csv/json input written as Parquet for analytics. Defaults to the
+            input format.
+        compression (str, optional): Parquet / ORC compression codec ('snappy', 'zstd',
+            'gzip', 'brotli', 'lz4', 'none'; 'zlib' for ORC). Defaults to 'snappy',
+            ignored for csv/json.
+        row_group_size (int, optional): Target rows per Parquet row group,
+            ignored for csv/json. With a memory budget the row groups are written
+            out before they take more than a chunk's share of it.
+        strategy (str): 'mask' replaces PII values with '***' (default), 'tokenize'
+            replaces them with reversible tokens stored in the `vault`.
+        vault (TokenVault, optional): Token vault (SQLiteVault, DynamoDBVault),
+            required by the 'tokenize' strategy.
+        verify_integrity (bool): Compares row counts, column order and checksums of the
+            non-PII columns between the read side and what the writer wrote, while
+            streaming, from what the writer serializes (nothing is read back).
+        report (dict, optional): Filled with the run details: 'primary_key',
+            'columns', 'obfuscated_fields', 'rows', 'chunks', 'integrity'
+            (if verify_integrity), 'stages' (busy seconds, items and utilization of the
+            read, mask, encrypt and upload stages) and 'bottleneck' (the busiest stage),
+            'memory' (if memory_budget_mb or profile_memory, see _memory_report).
+        pipeline_depth (int, optional): Runs the reader and the S3 uploader in their own
+            threads, connected to the masking by queues of at most `pipeline_depth`
+            chunks / parts. None runs the stages one after another.
+        part_size (int): Bytes per multipart part of an S3 URI `output` (min 5 MiB).
+        s3_client (boto3.client, optional): S3 client of the multipart upload.
+        memory_budget_mb (float, optional): Memory the run should stay within. Sources
+            too big for the in-memory engine are moved to the streaming engine, and the
+            chunk size shrinks while the process gets close to the budget.
+        profile_memory (bool): Traces the allocations (tracemalloc) and the RSS of every
+            stage, reported in report['stages'] and report['memory']. Concurrent runs
+            share the tracing, their stage peaks are upper bounds.
+        kms_key_id (str, optional): KMS key for envelope encryption of the output. Every
+            output gets its own data key, the chunks are encrypted (AES-GCM segments) while
+            they stream into the output. Decrypt with envelope_encryption.decrypt_data.
+        kms_client (boto3.client, optional): KMS client of the envelope encryption.
+        encryption_context (dict, optional): KMS encryption context, defaults to
+            {'object': output} for S3 URI outputs.
 
     Returns:
-        BytesIO: A byte stream object containing the obfuscated same data format.
+        BytesIO: A byte stream object containing the obfuscated data in the input format
+            or in `output_format` (or the given `output`, the S3 URI for uploads).
 
     Raises:
         Exception: unsupported file formats
+        ValueError: unsupported strategy or tokenize strategy without vault
         ValueError: empty input data
         ValueError: no primary key detectable
         Exception: no PII columns found to obfuscate
+        ValueError: integrity check failed
+        ImportError: kms_key_id without the 'cryptography' package
         Exception: general errors during obfuscator execution
     """
+    reader = None
+    uploader = None
+    profiling = False
     try:
-        # Determine file extension s3_source_path = s3://bucket/folder/file.csv
-        extension = s3_source_path.split(".")[
-            -1
-        ].lower()  # <-- 'csv', 'json', 'parquet'
+        label, extension, reader_input, is_s3 = _resolve_source(source, file_format)
 
         # 1. Load data based on format
-        if extension == "csv":
-            df = wr.s3.read_csv(s3_source_path)
-        elif extension == "json":
-            # important: orient="records" to match the json lines format
-            df = wr.s3.read_json(s3_source_path, orient="records")
-        elif extension == "parquet":
-            df = wr.s3.read_parquet(s3_source_path)
-        else:
-            # This should not happen due to prior EventBridge validation, but for conirmation.
-            logger.error(f"Unsupported format: {extension} from: {s3_source_path}")
+        engine = get_engine(extension)
+        if engine is None:
+            logger.error(f"Unsupported format: {extension} from: {label}")
             raise Exception(f"Unsupported format: {extension}")
 
-        # Raise error for empty dataframe
-        if df.empty:
-            raise ValueError(f"Error {s3_source_path}: The input data is empty.")
+        output_format = (output_format or extension).lower().lstrip(".")
+        output_engine = get_engine(output_format)
+        if output_engine is None:
+            logger.error(f"Unsupported output format: {output_format}")
+            raise Exception(f"Unsupported output format: {output_format}")
 
-        # ---- PRIMARY KEY VALIDATION ----
-        # Logic: unique, no null, equal length in all rows, consistent type/pattern
-        if not primary_key:
-            pk_candidates = [
-                col
-                for col in df.columns
-                if df[col].is_unique
-                and not df[col].isnull().any()
-                and df[col].astype(str).map(len).nunique() == 1
-                # and not df[col].astype(str).str.contains(' ').any()
-                and (
-                    pd.api.types.is_string_dtype(df[col])
-                    or pd.api.types.is_integer_dtype(df[col])
-                )
-            ]
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unsupported strategy: {strategy}")
+        if strategy == "tokenize" and vault is None:
+            raise ValueError("The tokenize strategy requires a token vault.")
 
-            # remove pii fields from pk_candidates (eg NIN, phone_number, email)
-            safe_pk_candidates = [col for col in pk_candidates if col not in pii_fields]
+        # ---- MEMORY BUDGET & PROFILING ----
+        governor = None
+        if memory_budget_mb:
+            governor = _MemoryGovernor(memory_budget_mb, chunksize)
+            chunksize = governor.plan(engine, _source_size(source, is_s3))
+        if profile_memory:
+            _TRACING.start()
+            profiling = True
 
-            if not safe_pk_candidates:
-                logger.error(
-                    f"No primary key detected in {s3_source_path}."
-                    f"Data records must be supplied with primary key."
-                )
-                raise ValueError(
-                    f"No primary key detected in {s3_source_path}."
-                    f"Data records must be supplied with primary key."
-                )
+        # ---- ARROW PASSTHROUGH ----
+        # between Arrow native formats (parquet, orc) the table is never converted to
+        # pandas, with column projection the masked columns are not even read.
+        # S3 objects are read whole, so only by the in-memory engine.
+        arrow_path = (
+            engine.arrow_native
+            and output_engine.arrow_native
+            and not (is_s3 and chunksize)
+        )
 
-            # priority on df.comumns[0] if it is in pk_candidates
-            primary_key = (
-                df.columns[0]
-                if df.columns[0] in safe_pk_candidates
-                else safe_pk_candidates[0]
+        # ---- TEXT PATH ----
+        # between text native formats (csv) the values stay the source text, so the
+        # untouched columns are copied exactly ('Exact Copy', no type inference)
+        text_path = engine.text_native and output_engine.text_native
+
+        start_time = time.perf_counter()
+        if arrow_path:
+            skip_columns = ()
+            if strategy == "mask" and engine.column_projection:
+                skip_columns = [field for field in pii_fields if field != primary_key]
+            frames = engine.iter_tables(
+                reader_input, is_s3, chunksize, skip_columns, s3_client
             )
+        else:
+            frames = _iter_frames(reader_input, engine, is_s3, chunksize, text_path)
+        reader = _PrefetchReader(
+            frames,
+            pipeline_depth,
+            stats=_StageStats(profile_memory),
+        )
+        df = next(reader, None)
+
+        # Raise error for empty dataframe
+        if df is None or _frame_is_empty(df):
+            raise ValueError(f"Error {label}: The input data is empty.")
+
+        # ---- PRIMARY KEY VALIDATION ----
+        # In streaming mode the key is detected on the first chunk
+        # and its uniqueness is checked across all following chunks.
+        # The set of seen keys grows with the file (not bounded by the chunk size).
+        seen_keys = None
+        if not primary_key:
+            primary_key = _detect_primary_key(df, pii_fields, label, text_path)
+            if chunksize and engine.chunkable:
+                seen_keys = set()
         logger.info(f"primary_key: {primary_key}")
 
         # 2. --- OBFUSCATION ---
         # Ensure primary key is not obfuscated
         safe_pii_fields = [field for field in pii_fields if field != primary_key]
 
-        logger.info(f"Starting Obfuscaton..., filtered_pii_fields: {safe_pii_fields}")
-
-        count_obf_col = 0
-        obf_pii_fields = []
+        logger.info(
+            f"Starting Obfuscaton ({strategy})..., filtered_pii_fields: {safe_pii_fields}"
+        )
 
-        for col in safe_pii_fields:
-            if col in df.columns:
-                df[col] = "***"
-                obf_pii_fields.append(col)
-                count_obf_col += 1
-                logger.info(f"obfuscated column: {col}")
+        writer_columns = _frame_columns(df)
+        obf_pii_fields = [col for col in safe_pii_fields if col in writer_columns]
 
-        if count_obf_col == 0:
+        if not obf_pii_fields:
             logger.warning("No PII columns found to obfuscate.")
             raise Exception("No PII columns found to obfuscate.")
 
-        logger.info(f"Successfully obfuscated {len(obf_pii_fields)} fields.")
-
         # 3. --- TRANSFORM back to BYTE STREAM ---
-        # no formating, ('Exact Copy')
-        output_buffer = BytesIO()
+        # no formating, ('Exact Copy') unless output_format converts it
+        if isinstance(output, str):
+            if not output.startswith("s3://"):
+                raise ValueError(
+                    f"output must be a file-like object or an S3 URI: {output}"
+                )
+            uploader = _MultipartUploader(
+                s3_client or boto3.client("s3"),
+                output,
+                part_size,
+                pipeline_depth,
+                stats=_StageStats(profile_memory),
+            )
+            output_buffer = uploader
+        else:
+            output_buffer = output if output is not None else BytesIO()
+
+        # encryption stage between the writer and the output, one segment in memory
+        encryptor = None
+        if kms_key_id:
+            if encryption_context is None and uploader:
+                encryption_context = {"object": output}
+            encryptor = EnvelopeEncryptor(
+                output_buffer,
+                kms_key_id,
+                kms_client=kms_client,
+                encryption_context=encryption_context,
+                stats=_StageStats(profile_memory),
+            )
+        integrity = None
+        if verify_integrity:
+            untouched = [col for col in writer_columns if col not in obf_pii_fields]
+            integrity = _IntegrityChecker(writer_columns, untouched, output_engine)
+
+        writer = output_engine.open_writer(
+            encryptor or output_buffer,
+            compression=compression,
+            row_group_size=row_group_size,
+            # buffered row groups count against the memory budget like a chunk
+            max_buffer_bytes=governor.chunk_budget_bytes if governor else None,
+            # the write side is hashed from what the writer wrote
+            on_write=(
+                (lambda written: integrity.update("write", written))
+                if integrity
+                else None
+            ),
+        )
 
-        if extension == "csv":
-            df.to_csv(output_buffer, index=False)
-        elif extension == "json":
-            df.to_json(output_buffer, orient="records", lines=False, date_format="iso")
-        elif extension == "parquet":
-            df.to_parquet(output_buffer, index=False)
+        mask_stats = _StageStats(profile_memory)
+        chunk_count = 0
+        row_count = 0
+        while df is not None:
+            if governor:
+                governor.observe(df)
+            with mask_stats.measure():
+                if integrity:
+                    integrity.update("read", df)
+                row_count += len(df)
+                if seen_keys is not None:
+                    seen_keys.update(_frame_column(df, primary_key))
+                    if len(seen_keys) != row_count:
+                        raise ValueError(
+                            f"Primary key {primary_key} is not unique across {label}."
+                        )
+                if arrow_path:
+                    df = _obfuscate_table(df, obf_pii_fields, strategy, vault)
+                else:
+                    _obfuscate_frame(df, obf_pii_fields, strategy, vault)
+                writer.write(df)
+            chunk_count += 1
+            mask_stats.items += 1
+            # the chunk is released before the next one is read
+            df = None
+            df = next(reader, None)
 
+        with mask_stats.measure():
+            writer.close()
+            if encryptor:
+                encryptor.finish()
+        if encryptor:
+            # the encryption ran inside the writer calls, not part of the masking
+            mask_stats.busy_seconds -= encryptor.stats.busy_seconds
+        if uploader and not uploader.threaded:
+            # so did the inline uploads so far, the last part is uploaded by complete()
+            mask_stats.busy_seconds -= uploader.stats.busy_seconds
+        # the nested timer readings can leave a tiny negative remainder
+        mask_stats.busy_seconds = max(0.0, mask_stats.busy_seconds)
+
+        if report is not None:
+            report.update(
+                columns=writer_columns,
+                primary_key=primary_key,
+                obfuscated_fields=obf_pii_fields,
+                rows=row_count,
+                chunks=chunk_count,
+            )
+
+        if integrity:
+            integrity_result = integrity.result()
+            if report is not None:
+                report["integrity"] = integrity_result
+            if not integrity_result["verified"]:
+                logger.error(f"Integrity check failed: {integrity_result}")
+                raise ValueError(
+                    f"Integrity check failed for {label}: "
+                    f"rows {integrity_result['rows_in']} -> {integrity_result['rows_out']}, "
+                    f"column order ok: {integrity_result['column_order_ok']}, "
+                    f"mismatched columns: {integrity_result['mismatched_columns']}"
+                )
+            logger.info(f"Integrity verified, checksum: {integrity_result['checksum']}")
+
+        # the S3 object only appears once the output is complete and verified
+        if uploader:
+            uploader.complete()
+        wall_seconds = time.perf_counter() - start_time
+
+        if report is not None:
+            stages = {"read": reader.stats, "mask": mask_stats}
+            if encryptor:
+                stages["encrypt"] = encryptor.stats
+            if uploader:
+                stages["upload"] = uploader.stats
+            report["stages"] = {
+                name: stats.result(wall_seconds) for name, stats in stages.items()
+            }
+            report["bottleneck"] = max(
+                stages, key=lambda name: stages[name].busy_seconds
+            )
+            if governor or profile_memory:
+                report["memory"] = _memory_report(governor, stages.values())
+                logger.info(f"Memory report: {report['memory']}")
+
+        for col in obf_pii_fields:
+            logger.info(f"obfuscated column: {col}")
+        logger.info(
+            f"Successfully obfuscated {len(obf_pii_fields)} fields, "
+            f"{row_count} rows in {chunk_count} chunk(s)."
+        )
         logger.info(f"output_buffer: {output_buffer} created successfully.")
 
         # Reset buffer position to the beginning
-        output_buffer.seek(0)
+        if output is None:
+            output_buffer.seek(0)
 
-        return output_buffer
+        return output if uploader else output_buffer
 
     # Error handling
     except Exception as e:
         logger.error(f"Error in obfuscate_data: {str(e)}")
+        if uploader:
+            uploader.abort()
+        raise
+    finally:
+        if reader:
+            reader.close()
+        if profiling:
+            _TRACING.stop()
+
+
+# ==========================================================
+# DATASET MODE
+# Hive-partitioned datasets (.../year=2024/month=03/part-*.parquet) under an S3 prefix.
+# ==========================================================
+MANIFEST_NAME = "_manifest.json"
+
+
+def _output_key(key, output_format=None):
+    """Output key of a source key, with the extension of the new format if converted."""
+    if output_format:
+        return f"{key.rsplit('.', 1)[0]}.{output_format.lower()}"
+    return key
+
+
+def _is_data_file(relative_key):
+    """
+    True for a partition file: a supported extension and no path segment starting
+    with '_' or '.' (Hive/Spark metadata and temporary files: _delta_log/, _SUCCESS,
+    _manifest.json, .part-0.crc).
+    """
+    if any(segment.startswith(("_", ".")) for segment in relative_key.split("/")):
+        return False
+    return get_engine(relative_key.split(".")[-1]) is not None
+
+
+def _build_obfuscation_plan(s3_path, pii_fields, primary_key=None, probe_rows=100_000):
+    """
+    Reads the schema and detects the primary key once, on the first partition.
+
+    Only the first `probe_rows` rows are read for partitions of a chunkable format.
+
+    Returns:
+        dict: 'columns', 'primary_key' and 'obfuscated_fields' shared by all partitions.
+
+    Raises:
+        ValueError: empty first partition
+        ValueError: no primary key detectable
+        Exception: no PII columns found to obfuscate
+    """
+    label, extension, reader_input, is_s3 = _resolve_source(s3_path)
+    df = next(
+        _iter_frames(reader_input, get_engine(extension), is_s3, probe_rows), None
+    )
+    if df is None or df.empty:
+        raise ValueError(f"Error {label}: The input data is empty.")
+
+    if not primary_key:
+        primary_key = _detect_primary_key(df, pii_fields, label)
+
+    obf_pii_fields = [
+        col for col in pii_fields if col != primary_key and col in df.columns
+    ]
+    if not obf_pii_fields:
+        logger.warning("No PII columns found to obfuscate.")
+        raise Exception("No PII columns found to obfuscate.")
+
+    return {
+        "columns": list(df.columns),
+        "primary_key": primary_key,
+        "obfuscated_fields": obf_pii_fields,
+    }
+
+
+def obfuscate_dataset(
+    s3_source_prefix,
+    s3_destination_prefix,
+    pii_fields,
+    primary_key=None,
+    max_workers=8,
+    s3_client=None,
+    **options,
+):
+    """
+    Obfuscates every partition file of a dataset under an S3 prefix.
+
+    The schema is read and the primary key detected once (first partition), and that
+    obfuscation plan is shared by all partitions, which are then processed in parallel.
+    The output mirrors the partition layout below the destination prefix, and a
+    _manifest.json listing the plan and every partition is written next to it.
+    Paths with a segment starting with '_' or '.' (metadata, temporary files) are skipped.
+
+    Args:
+        s3_source_prefix (str): S3 prefix of the dataset (s3://bucket/lake/students/).
+        s3_destination_prefix (str): S3 prefix of the output (s3://dest/obfuscated/students/).
+        pii_fields (list): List of the column names to be obfuscated [***].
+        primary_key (str, optional): Primary key column name. None for auto-detect.
+        max_workers (int): Partitions processed in parallel.
+        s3_client (boto3.client, optional): S3 client for the uploads.
+        **options: Passed on to obfuscate_data (output_format, compression, row_group_size,
+            chunksize, strategy, vault, verify_integrity).
+
+    Returns:
+        dict: The manifest (plan, partitions with source, destination and rows).
+
+    Raises:
+        ValueError: no partition files found under the prefix
+        ValueError: a partition does not match the dataset schema
+        Exception: partitions failed, the manifest is not written
+    """
+    try:
+        source_prefix = s3_source_prefix.rstrip("/") + "/"
+        destination_prefix = s3_destination_prefix.rstrip("/") + "/"
+        s3_client = s3_client or boto3.client("s3")
+
+        # 1. --- DISCOVER PARTITIONS ---
+        partitions = sorted(
+            path
+            for path in wr.s3.list_objects(source_prefix)
+            if _is_data_file(path[len(source_prefix) :])  # noqa: E203
+        )
+        if not partitions:
+            raise ValueError(f"No partition files found under {source_prefix}")
+        logger.info(f"Dataset {source_prefix}: {len(partitions)} partition file(s)")
+
+        # 2. --- ONE OBFUSCATION PLAN FOR THE DATASET ---
+        plan = _build_obfuscation_plan(partitions[0], pii_fields, primary_key)
+        logger.info(f"Dataset obfuscation plan: {plan}")
+
+        destination = urlparse(destination_prefix)
+
+        def process_partition(path):
+            # schema probe first (the footer of parquet/orc), a mismatch reads no data
+            _, extension, reader_input, is_s3 = _resolve_source(path)
+            columns = (
+                get_engine(extension).probe_schema(reader_input, is_s3, s3_client).names
+            )
+            if columns != plan["columns"]:
+                raise ValueError(
+                    f"Partition {path} does not match the dataset schema: "
+                    f"{columns} != {plan['columns']}"
+                )
+            report = {}
+            obfuscated_stream = obfuscate_data(
+                path,
+                plan["obfuscated_fields"],
+                primary_key=plan["primary_key"],
+                report=report,
+                **options,
+            )
+            # mirrored partition layout, eg year=2024/month=03/part-0.parquet
+            relative_key = _output_key(
+                path[len(source_prefix) :], options.get("output_format")  # noqa: E203
+            )
+            destination_key = destination.path.lstrip("/") + relative_key
+            s3_client.put_object(
+                Bucket=destination.netloc,
+                Key=destination_key,
+                Body=obfuscated_stream.getvalue(),
+            )
+            partition = {
+                "source": path,
+                "destination": f"s3://{destination.netloc}/{destination_key}",
+                "rows": report["rows"],
+            }
+            if "integrity" in report:
+                partition["checksum"] = report["integrity"]["checksum"]
+            return partition
+
+        # 3. --- PROCESS PARTITIONS IN PARALLEL ---
+        results, failed = [], []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                path: executor.submit(process_partition, path) for path in partitions
+            }
+            for path, future in futures.items():
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Partition {path} failed: {str(e)}")
+                    failed.append(path)
+
+        if failed:
+            raise Exception(f"{len(failed)} partition(s) failed: {failed}")
+
+        # 4. --- MANIFEST ---
+        manifest = {
+            "source_prefix": source_prefix,
+            "destination_prefix": destination_prefix,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "plan": plan,
+            "rows": sum(partition["rows"] for partition in results),
+            "partitions": results,
+        }
+        s3_client.put_object(
+            Bucket=destination.netloc,
+            Key=destination.path.lstrip("/") + MANIFEST_NAME,
+            Body=json.dumps(manifest, indent=2).encode("utf-8"),
+        )
+        logger.info(
+            f"Dataset obfuscated: {len(results)} partition(s), {manifest['rows']} rows "
+            f"-> {destination_prefix}{MANIFEST_NAME}"
+        )
+
+        return manifest
+
+    # Error handling
+    except Exception as e:
+        logger.error(f"Error in obfuscate_dataset: {str(e)}")
         raise
@@ -0,0 +1,327 @@
+from collections import OrderedDict
+import logging
+import secrets
+import sqlite3
+import threading
+
+import boto3
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# TOKENIZATION VAULT
+# Reversible pseudonymization: every PII value gets a random token, the value<->token
+# mapping is kept in a vault backend so allowed teams can re-identify the records.
+# ==========================================================
+class TokenVault:
+    """
+    Base class of the vault backends.
+
+    Values are tokenized per column, in batches: one backend lookup for all the unique
+    values of a column chunk and one insert for the values seen for the first time.
+    A bounded LRU cache sits in front of the backend, so repeated values (eg the same
+    customer in every file) never reach it.
+
+    Backends implement `_lookup_tokens`, `_insert_tokens` and `_lookup_values`.
+
+    Args:
+        cache_size (int): Maximum number of mappings kept in the LRU cache.
+    """
+
+    def __init__(self, cache_size=100_000):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # ---- LRU CACHE ----
+    def _cache_get(self, key):
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _cache_put(self, column, value_to_token):
+        with self._cache_lock:
+            for value, token in value_to_token.items():
+                # both directions, detokenizing a fresh token does not hit the backend
+                self._cache[("v", column, value)] = token
+                self._cache[("t", column, token)] = value
+                self._cache.move_to_end(("v", column, value))
+                self._cache.move_to_end(("t", column, token))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _new_token():
+        return f"tok_{secrets.token_hex(8)}"
+
+    # ---- PUBLIC API ----
+    def tokenize_many(self, column, values):
+        """
+        Returns the tokens of the values, creating tokens for unseen values.
+
+        Args:
+            column (str): Column name, tokens are scoped per column.
+            values (iterable): String values (duplicates are looked up once).
+
+        Returns:
+            dict: value -> token
+        """
+        result = {}
+        missing = []
+        for value in dict.fromkeys(values):
+            token = self._cache_get(("v", column, value))
+            if token is None:
+                missing.append(value)
+            else:
+                result[value] = token
+
+        if missing:
+            found = self._lookup_tokens(column, missing)
+            new_values = [value for value in missing if value not in found]
+            if new_values:
+                # the backend returns the stored tokens, a concurrent writer may have won
+                found.update(
+                    self._insert_tokens(
+                        column, {value: self._new_token() for value in new_values}
+                    )
+                )
+                logger.info(
+                    f"Vault: {len(new_values)} new token(s) for column {column}"
+                )
+            self._cache_put(column, found)
+            result.update(found)
+
+        return result
+
+    def detokenize_many(self, column, tokens):
+        """
+        Returns the original values of the tokens (re-identification).
+
+        Args:
+            column (str): Column name the tokens were created for.
+            tokens (iterable): Tokens to resolve.
+
+        Returns:
+            dict: token -> value, unknown tokens are left out.
+        """
+        result = {}
+        missing = []
+        for token in dict.fromkeys(tokens):
+            value = self._cache_get(("t", column, token))
+            if value is None:
+                missing.append(token)
+            else:
+                result[token] = value
+
+        if missing:
+            found = self._lookup_values(column, missing)
+            self._cache_put(column, {value: token for token, value in found.items()})
+            result.update(found)
+
+        return result
+
+    # ---- BACKEND ----
+    def _lookup_tokens(self, column, values):
+        """Returns {value: token} of the values already in the vault."""
+        raise NotImplementedError
+
+    def _insert_tokens(self, column, value_to_token):
+        """Stores the new mappings and returns the {value: token} actually stored."""
+        raise NotImplementedError
+
+    def _lookup_values(self, column, tokens):
+        """Returns {token: value} of the tokens in the vault."""
+        raise NotImplementedError
+
+
+def _batches(items, size):
+    """Splits a list into lists of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]  # noqa: E203
+
+
+class SQLiteVault(TokenVault):
+    """
+    Vault backend on a local SQLite database, for local and batch use.
+
+    Args:
+        path (str): Database file, ':memory:' for a throw-away vault.
+        cache_size (int): Maximum number of mappings kept in the LRU cache.
+    """
+
+    # SQLite limits the number of '?' parameters of a statement
+    BATCH_SIZE = 500
+
+    def __init__(self, path=":memory:", cache_size=100_000):
+        super().__init__(cache_size=cache_size)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                "column_name TEXT NOT NULL, value TEXT NOT NULL, token TEXT NOT NULL, "
+                "PRIMARY KEY (column_name, value), UNIQUE (column_name, token))"
+            )
+
+    def _select(self, column, key_column, keys):
+        other = "token" if key_column == "value" else "value"
+        result = {}
+        with self._lock:
+            for batch in _batches(keys, self.BATCH_SIZE):
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT {key_column}, {other} FROM tokens "  # nosec B608
+                    f"WHERE column_name = ? AND {key_column} IN ({placeholders})",
+                    [column, *batch],
+                )
+                result.update(rows)
+        return result
+
+    def _lookup_tokens(self, column, values):
+        return self._select(column, "value", values)
+
+    def _insert_tokens(self, column, value_to_token):
+        with self._lock, self._connection:
+            # a value inserted by another process in the meantime keeps its token
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO tokens (column_name, value, token) VALUES (?, ?, ?)",
+                [(column, value, token) for value, token in value_to_token.items()],
+            )
+        return self._select(column, "value", list(value_to_token))
+
+    def _lookup_values(self, column, tokens):
+        return self._select(column, "token", tokens)
+
+    def close(self):
+        self._connection.close()
+
+
+class DynamoDBVault(TokenVault):
+    """
+    Vault backend on a DynamoDB table (partition key 'pk', string).
+
+    Every mapping is stored as two items, 'v#<column>#<value>' -> token and
+    't#<column>#<token>' -> value, so both directions are single key lookups.
+    Lookups use BatchGetItem (100 keys per request). New mappings are written with
+    TransactWriteItems, both items of 50 values per request, the value items only if
+    they do not exist yet: if two writers tokenize the same new value at the same time
+    the first one wins and the other gets the stored token, so a value always has a
+    single token (and no token item of the losing writer is left behind).
+
+    Args:
+        table_name (str): DynamoDB table name.
+        dynamodb_client (boto3.client, optional): DynamoDB client. Defaults to a new one.
+        cache_size (int): Maximum number of mappings kept in the LRU cache.
+    """
+
+    GET_BATCH_SIZE = 100
+    # two items per value, a transaction takes at most 100 items
+    TRANSACT_BATCH_SIZE = 50
+
+    def __init__(self, table_name, dynamodb_client=None, cache_size=100_000):
+        super().__init__(cache_size=cache_size)
+        self.table_name = table_name
+        self._client = dynamodb_client or boto3.client("dynamodb")
+
+    def _batch_get(self, keys, attribute):
+        """Returns {pk: attribute value} of the existing items."""
+        result = {}
+        for batch in _batches(keys, self.GET_BATCH_SIZE):
+            request = {
+                self.table_name: {
+                    "Keys": [{"pk": {"S": key}} for key in batch],
+                    # 'token' and 'value' are DynamoDB reserved words
+                    "ProjectionExpression": "pk, #attribute",
+                    "ExpressionAttributeNames": {"#attribute": attribute},
+                }
+            }
+            while request:
+                response = self._client.batch_get_item(RequestItems=request)
+                for item in response["Responses"].get(self.table_name, []):
+                    result[item["pk"]["S"]] = item[attribute]["S"]
+                request = response.get("UnprocessedKeys")
+        return result
+
+    def _lookup_tokens(self, column, values):
+        keys = {f"v#{column}#{value}": value for value in values}
+        found = self._batch_get(list(keys), "token")
+        return {keys[pk]: token for pk, token in found.items()}
+
+    def _insert_tokens(self, column, value_to_token):
+        lost = []
+        for batch in _batches(list(value_to_token.items()), self.TRANSACT_BATCH_SIZE):
+            while batch:
+                try:
+                    self._client.transact_write_items(
+                        TransactItems=self._transact_items(column, batch)
+                    )
+                    break
+                except self._client.exceptions.TransactionCanceledException as e:
+                    # one reason per item, in order: the value item of each pair first
+                    codes = [
+                        reason.get("Code", "None")
+                        for reason in e.response.get("CancellationReasons", [])
+                    ]
+                    if len(codes) != 2 * len(batch) or not set(codes) <= {
+                        "None",
+                        "ConditionalCheckFailed",
+                        "TransactionConflict",
+                    }:
+                        raise
+                    # nothing was written, the batch is retried without the lost values
+                    lost += [
+                        value
+                        for (value, _), code in zip(batch, codes[::2])
+                        if code == "ConditionalCheckFailed"
+                    ]
+                    batch = [
+                        pair
+                        for pair, code in zip(batch, codes[::2])
+                        if code != "ConditionalCheckFailed"
+                    ]
+
+        stored = dict(value_to_token)
+        if lost:
+            # a concurrent writer won, its token is the one handed out
+            stored.update(self._lookup_tokens(column, lost))
+            logger.info(f"Vault: {len(lost)} value(s) tokenized concurrently")
+        return stored
+
+    def _transact_items(self, column, pairs):
+        items = []
+        for value, token in pairs:
+            items.append(
+                {
+                    "Put": {
+                        "TableName": self.table_name,
+                        "Item": {
+                            "pk": {"S": f"v#{column}#{value}"},
+                            "token": {"S": token},
+                        },
+                        # the first writer of a value wins
+                        "ConditionExpression": "attribute_not_exists(pk)",
+                    }
+                }
+            )
+            # tokens are random, so token items never collide
+            items.append(
+                {
+                    "Put": {
+                        "TableName": self.table_name,
+                        "Item": {
+                            "pk": {"S": f"t#{column}#{token}"},
+                            "value": {"S": value},
+                        },
+                    }
+                }
+            )
+        return items
+
+    def _lookup_values(self, column, tokens):
+        keys = {f"t#{column}#{token}": token for token in tokens}
+        found = self._batch_get(list(keys), "value")
+        return {keys[pk]: value for pk, value in found.items()}
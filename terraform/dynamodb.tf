@@ -0,0 +1,21 @@
+# ------------------------------
+# Token vault of the 'tokenize' strategy (value <-> token mappings)
+# ------------------------------
+resource "aws_dynamodb_table" "token_vault" {
+  name         = "gdpr-obfuscator-token-vault"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "pk"
+
+  attribute {
+    name = "pk"
+    type = "S"
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+}
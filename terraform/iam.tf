@@ -33,6 +33,7 @@ data "aws_iam_policy_document" "lambda_combined_S3_cloudewatch_policy_doc" {
     actions = [
       "s3:GetObject",
       "s3:PutObject",
+      "s3:AbortMultipartUpload",
       "s3:DeleteObject",
       "s3:ListBucket"
     ]
@@ -44,6 +45,37 @@ data "aws_iam_policy_document" "lambda_combined_S3_cloudewatch_policy_doc" {
     ]
   }
 
+  # Allow lambda to look up and store tokens in the token vault (batched, the
+  # TransactWriteItems inserts are authorized per item by PutItem)
+  statement {
+    effect = "Allow"
+    actions = [
+      "dynamodb:BatchGetItem",
+      "dynamodb:PutItem"
+    ]
+    resources = [aws_dynamodb_table.token_vault.arn]
+  }
+
+  # Allow lambda to read the per-prefix PII rules config object (if configured)
+  dynamic "statement" {
+    for_each = var.pii_rules_uri == "" ? [] : [var.pii_rules_uri]
+    content {
+      effect    = "Allow"
+      actions   = ["s3:GetObject"]
+      resources = ["arn:aws:s3:::${trimprefix(statement.value, "s3://")}"]
+    }
+  }
+
+  # Allow lambda to generate a data key per output for envelope encryption (if configured)
+  dynamic "statement" {
+    for_each = var.kms_key_id == "" ? [] : [var.kms_key_id]
+    content {
+      effect    = "Allow"
+      actions   = ["kms:GenerateDataKey"]
+      resources = [statement.value]
+    }
+  }
+
   # Define CloudWatch Logs policy to allow lambda to write logs and metrics
   statement {
     effect = "Allow"
@@ -105,7 +137,8 @@ resource "aws_cloudwatch_event_rule" "s3_object_upload_rule" {
       "key": [ 
         { "suffix": ".csv" },
         { "suffix": ".json" },
-        { "suffix": ".parquet" } 
+        { "suffix": ".parquet" },
+        { "suffix": ".orc" }
       ]
     }
   }
@@ -1,4 +1,5 @@
-# Zip Lambda layer: obfuscator_lib.py and __init__.py
+# Zip Lambda layer: obfuscator_lib.py, format_engines.py, envelope_encryption.py,
+# token_vault.py and __init__.py
 data "archive_file" "obfuscator_layer_zip" {
   type        = "zip"
   output_path = "${path.module}/../deployment/obfuscator_layer.zip"
@@ -9,6 +10,21 @@ data "archive_file" "obfuscator_layer_zip" {
     filename = "python/utils/obfuscator_lib.py"
   }
 
+  source {
+    content  = file("${path.module}/../src/utils/format_engines.py")
+    filename = "python/utils/format_engines.py"
+  }
+
+  source {
+    content  = file("${path.module}/../src/utils/envelope_encryption.py")
+    filename = "python/utils/envelope_encryption.py"
+  }
+
+  source {
+    content  = file("${path.module}/../src/utils/token_vault.py")
+    filename = "python/utils/token_vault.py"
+  }
+
   source {
     content  = file("${path.module}/../src/utils/__init__.py")
     filename = "python/utils/__init__.py"
@@ -38,7 +54,7 @@ resource "aws_lambda_function" "gdpr_obfuscator_lambda" {
   handler       = "lambda_function.lambda_handler" # <-- file_name.function_name
   runtime       = "python3.12"
   # set memory size and timeout
-  memory_size = 512 # <-- it can go down to 256MB if needed
+  memory_size = var.lambda_memory_size # <-- right-size with the memory report (PROFILE_MEMORY)
   timeout     = 60
 
   # TWO LAYERS: awswrangler|pandas + obfuscator library
@@ -51,9 +67,18 @@ resource "aws_lambda_function" "gdpr_obfuscator_lambda" {
 
   environment {
     variables = {
-      DESTINATION_BUCKET = aws_s3_bucket.obfuscated_bucket.bucket
-      PII_FIELDS         = join(",", var.pii_fields)
-      PRIMARY_KEY        = var.primary_key
+      DESTINATION_BUCKET     = aws_s3_bucket.obfuscated_bucket.bucket
+      PII_FIELDS             = join(",", var.pii_fields)
+      PRIMARY_KEY            = var.primary_key
+      OUTPUT_FORMAT          = var.output_format
+      PARQUET_COMPRESSION    = var.parquet_compression
+      PARQUET_ROW_GROUP_SIZE = var.parquet_row_group_size
+      PII_RULES_URI          = var.pii_rules_uri
+      PII_RULES_TTL_SECONDS  = var.pii_rules_ttl_seconds
+      TOKEN_VAULT_TABLE      = aws_dynamodb_table.token_vault.name
+      MEMORY_BUDGET_MB       = floor(var.lambda_memory_size * var.memory_budget_share)
+      PROFILE_MEMORY         = var.profile_memory
+      KMS_KEY_ID             = var.kms_key_id
     }
   }
 }
\ No newline at end of file
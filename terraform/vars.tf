@@ -11,4 +11,57 @@ variable "pii_fields" {
 variable "primary_key" {
   description = "primary_key"
   type        = string
-}
\ No newline at end of file
+}
+variable "output_format" {
+  description = "Output format of the obfuscated files (csv, json, parquet, orc). Empty keeps the input format"
+  type        = string
+  default     = ""
+}
+
+variable "parquet_compression" {
+  description = "Compression codec of Parquet output (snappy, zstd, gzip, brotli, lz4, none)"
+  type        = string
+  default     = "zstd"
+}
+
+variable "parquet_row_group_size" {
+  description = "Target rows per Parquet row group"
+  type        = number
+  default     = 1000000
+}
+
+variable "pii_rules_uri" {
+  description = "S3 URI of the per-prefix PII rules config (s3://config-bucket/pii_rules.json). Empty disables it"
+  type        = string
+  default     = ""
+}
+
+variable "pii_rules_ttl_seconds" {
+  description = "Seconds the Lambda container reuses the PII rules before revalidating them"
+  type        = number
+  default     = 300
+}
+
+variable "lambda_memory_size" {
+  description = "Memory (MB) of the obfuscator Lambda, see recommended_memory_size_mb of the memory report"
+  type        = number
+  default     = 512
+}
+
+variable "memory_budget_share" {
+  description = "Share of the Lambda memory a file may use before chunks shrink or the streaming engine is used"
+  type        = number
+  default     = 0.8
+}
+
+variable "profile_memory" {
+  description = "Trace allocations and RSS per stage and return the memory report"
+  type        = bool
+  default     = false
+}
+
+variable "kms_key_id" {
+  description = "ARN of the KMS key the obfuscated files are envelope encrypted with. Empty disables encryption"
+  type        = string
+  default     = ""
+}
@@ -0,0 +1,147 @@
+import pytest
+import asyncio
+import boto3
+import threading
+import time
+import awswrangler as wr
+import pandas as pd
+from unittest.mock import patch
+from moto import mock_aws
+from src.utils import async_obfuscator
+from src.utils.async_obfuscator import obfuscate_data_async, obfuscate_many_async
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame(
+        {
+            "student_id": [1234, 5678],
+            "name": ["John Smith", "Jane Doe"],
+            "course": ["Software", "Data Science"],
+        }
+    )
+
+
+@pytest.fixture
+def s3_client(sample_df):
+    """Yields a mocked S3 client with 6 csv files in the source bucket."""
+    with mock_aws():
+        client = boto3.client("s3", region_name="eu-west-2")
+        for bucket in ("source-bucket-test", "dest-bucket-test"):
+            client.create_bucket(
+                Bucket=bucket,
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+        for i in range(6):
+            wr.s3.to_csv(
+                df=sample_df,
+                path=f"s3://source-bucket-test/new_data/file{i}.csv",
+                index=False,
+            )
+        yield client
+
+
+class TestObfuscateDataAsync:
+    def test_s3_file_is_obfuscated_and_uploaded(self, s3_client):
+        report = {}
+
+        result = asyncio.run(
+            obfuscate_data_async(
+                "s3://source-bucket-test/new_data/file0.csv",
+                ["name"],
+                destination="s3://dest-bucket-test/obfuscated/file0.parquet",
+                s3_client=s3_client,
+                output_format="parquet",
+                report=report,
+            )
+        )
+
+        assert report["rows"] == 2
+        result_df = wr.s3.read_parquet("s3://dest-bucket-test/obfuscated/file0.parquet")
+        assert list(result_df["name"]) == ["***", "***"]
+        assert (
+            result.getvalue()
+            == s3_client.get_object(
+                Bucket="dest-bucket-test", Key="obfuscated/file0.parquet"
+            )["Body"].read()
+        )
+
+    def test_in_memory_source_without_destination(self, sample_df):
+        data = sample_df.to_csv(index=False).encode("utf-8")
+
+        result = asyncio.run(obfuscate_data_async(data, ["name"], file_format="csv"))
+
+        assert list(pd.read_csv(result)["name"]) == ["***", "***"]
+
+
+class TestObfuscateManyAsync:
+    def test_files_in_flight_are_bounded(self, s3_client):
+        original = async_obfuscator.obfuscate_data
+        lock = threading.Lock()
+        in_flight = {"now": 0, "max": 0}
+
+        def tracking_obfuscate_data(*args, **kwargs):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            time.sleep(0.05)
+            try:
+                return original(*args, **kwargs)
+            finally:
+                with lock:
+                    in_flight["now"] -= 1
+
+        sources = [f"s3://source-bucket-test/new_data/file{i}.csv" for i in range(6)]
+        with patch.object(async_obfuscator, "obfuscate_data", tracking_obfuscate_data):
+            results = asyncio.run(
+                obfuscate_many_async(
+                    iter(sources),
+                    ["name"],
+                    "s3://dest-bucket-test/obfuscated/",
+                    max_in_flight=2,
+                    s3_client=s3_client,
+                )
+            )
+
+        assert in_flight["max"] == 2
+        assert [result["source"] for result in results] == sources
+        assert results[5]["destination"] == (
+            "s3://dest-bucket-test/obfuscated/new_data/file5.csv"
+        )
+        assert all(result["rows"] == 2 for result in results)
+        result_df = wr.s3.read_csv(
+            "s3://dest-bucket-test/obfuscated/new_data/file3.csv"
+        )
+        assert list(result_df["name"]) == ["***", "***"]
+
+    def test_failed_files_are_reported_after_the_others(self, s3_client):
+        sources = [
+            "s3://source-bucket-test/new_data/file0.csv",
+            "s3://source-bucket-test/new_data/missing.csv",
+            "s3://source-bucket-test/new_data/file1.csv",
+        ]
+
+        with pytest.raises(Exception) as excinfo:
+            asyncio.run(
+                obfuscate_many_async(
+                    sources,
+                    ["name"],
+                    "s3://dest-bucket-test/obfuscated/",
+                    s3_client=s3_client,
+                )
+            )
+
+        assert "1 file(s) failed" in str(excinfo.value)
+        assert "missing.csv" in str(excinfo.value)
+        listing = s3_client.list_objects_v2(Bucket="dest-bucket-test")
+        assert len(listing["Contents"]) == 2
@@ -0,0 +1,189 @@
+import pytest
+import pandas as pd
+import pandas.testing as pdt
+from src.utils.obfuscator_lib import obfuscate_data
+from src.utils.cli import main
+
+
+@pytest.fixture
+def sample_df():
+    """Sample data spread over several chunks."""
+    return pd.DataFrame(
+        {
+            "student_id": [1234, 5678, 9012, 3456, 7890],
+            "name": ["John Smith", "Jane Doe", "Ann Lee", "Bob Ray", "Tim Cole"],
+            "course": ["Software", "Data Science", "DevOps", "Software", "Cloud"],
+            "email_address": [
+                "j.s@email.com",
+                "j.d@email.com",
+                "a@x.com",
+                "b@x.com",
+                "t@x.com",
+            ],
+        }
+    )
+
+
+@pytest.fixture
+def expected_df(sample_df):
+    """Sample data with the PII fields masked."""
+    expected = sample_df.copy()
+    expected["name"] = "***"
+    expected["email_address"] = "***"
+    return expected
+
+
+class TestStreamingEngine:
+    def test_chunked_csv_matches_in_memory_output(self, tmp_path, sample_df):
+        local_file = tmp_path / "students.csv"
+        sample_df.to_csv(local_file, index=False)
+
+        in_memory = obfuscate_data(local_file, ["name", "email_address"])
+        streamed = obfuscate_data(local_file, ["name", "email_address"], chunksize=2)
+
+        assert streamed.getvalue() == in_memory.getvalue()
+
+    def test_chunked_parquet_output(self, tmp_path, sample_df, expected_df):
+        local_file = tmp_path / "students.parquet"
+        sample_df.to_parquet(local_file, index=False)
+
+        result = obfuscate_data(local_file, ["name", "email_address"], chunksize=2)
+
+        pdt.assert_frame_equal(pd.read_parquet(result), expected_df)
+
+    def test_chunked_primary_key_duplicated_in_later_chunk_raises_error(self, tmp_path):
+        df = pd.DataFrame(
+            {
+                "student_id": [1234, 5678, 1234],
+                "name": ["John Smith", "Jane Doe", "John Smith"],
+                "course": ["Software", "Data Science", "DevOps"],
+            }
+        )
+        local_file = tmp_path / "duplicates.csv"
+        df.to_csv(local_file, index=False)
+
+        with pytest.raises(ValueError) as excinfo:
+            obfuscate_data(local_file, ["name"], chunksize=2)
+
+        assert "Primary key student_id is not unique" in str(excinfo.value)
+
+
+class TestCli:
+    def test_cli_obfuscates_directory(self, tmp_path, sample_df, expected_df, capsys):
+        input_dir = tmp_path / "raw"
+        (input_dir / "2024").mkdir(parents=True)
+        sample_df.to_csv(input_dir / "students.csv", index=False)
+        sample_df.to_parquet(input_dir / "2024" / "students.parquet", index=False)
+        (input_dir / "notes.txt").write_text("not a supported file")
+        output_dir = tmp_path / "out"
+
+        exit_code = main(
+            [
+                str(input_dir),
+                "--pii-fields",
+                "name,email_address",
+                "--output-dir",
+                str(output_dir),
+                "--workers",
+                "2",
+                # force the streaming engine on the tiny test files
+                "--streaming-threshold-mb",
+                "0",
+                "--chunksize",
+                "2",
+            ]
+        )
+
+        assert exit_code == 0
+        pdt.assert_frame_equal(pd.read_csv(output_dir / "students.csv"), expected_df)
+        pdt.assert_frame_equal(
+            pd.read_parquet(output_dir / "2024" / "students.parquet"), expected_df
+        )
+        summary = capsys.readouterr().out
+        assert "[streaming]" in summary
+        assert "Total: 2/2 files" in summary
+
+    def test_cli_reports_failed_files(self, tmp_path, sample_df, capsys):
+        sample_df.to_csv(tmp_path / "good.csv", index=False)
+        sample_df[["student_id", "course"]].to_csv(tmp_path / "no_pii.csv", index=False)
+
+        exit_code = main(
+            [
+                str(tmp_path / "*.csv"),
+                "--pii-fields",
+                "name,email_address",
+                "--output-dir",
+                str(tmp_path / "out"),
+            ]
+        )
+
+        assert exit_code == 1
+        summary = capsys.readouterr().out
+        assert "FAILED" in summary
+        assert "No PII columns found to obfuscate." in summary
+        assert "Total: 1/2 files" in summary
+
+    def test_failed_file_leaves_no_output(self, tmp_path, sample_df):
+        # the duplicate key is only seen in the last chunk
+        duplicated = pd.concat([sample_df, sample_df.iloc[[0]]])
+        duplicated.to_csv(tmp_path / "students.csv", index=False)
+        output_dir = tmp_path / "out"
+
+        exit_code = main(
+            [
+                str(tmp_path / "students.csv"),
+                "--pii-fields",
+                "name,email_address",
+                "--output-dir",
+                str(output_dir),
+                "--chunksize",
+                "2",
+                "--streaming-threshold-mb",
+                "0",
+            ]
+        )
+
+        assert exit_code == 1
+        assert list(output_dir.iterdir()) == []
+
+    def test_cli_mirrors_glob_layout(self, tmp_path, sample_df, expected_df):
+        for year in ("2024", "2025"):
+            (tmp_path / "raw" / year).mkdir(parents=True)
+            sample_df.to_csv(tmp_path / "raw" / year / "part.csv", index=False)
+        output_dir = tmp_path / "out"
+
+        exit_code = main(
+            [
+                str(tmp_path / "raw" / "*" / "part.csv"),
+                "--pii-fields",
+                "name,email_address",
+                "--output-dir",
+                str(output_dir),
+            ]
+        )
+
+        assert exit_code == 0
+        for year in ("2024", "2025"):
+            pdt.assert_frame_equal(
+                pd.read_csv(output_dir / year / "part.csv"), expected_df
+            )
+
+    def test_cli_rejects_colliding_output_paths(self, tmp_path, sample_df):
+        for year in ("2024", "2025"):
+            (tmp_path / year).mkdir()
+            sample_df.to_csv(tmp_path / year / "part.csv", index=False)
+
+        with pytest.raises(ValueError) as excinfo:
+            main(
+                [
+                    str(tmp_path / "2024" / "*.csv"),
+                    str(tmp_path / "2025" / "*.csv"),
+                    "--pii-fields",
+                    "name",
+                    "--output-dir",
+                    str(tmp_path / "out"),
+                ]
+            )
+
+        assert "would both be written to part.csv" in str(excinfo.value)
+        assert not (tmp_path / "out").exists()
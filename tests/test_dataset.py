@@ -0,0 +1,146 @@
+import pytest
+import boto3
+import json
+import awswrangler as wr
+import pandas as pd
+from unittest.mock import patch
+from moto import mock_aws
+from src.utils import obfuscator_lib
+from src.utils.obfuscator_lib import obfuscate_dataset
+from src.lambda_function import lambda_handler
+
+PARTITIONS = ["year=2024/month=01", "year=2024/month=02", "year=2024/month=03"]
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def s3_client():
+    """Yields a mocked S3 client with a Hive-partitioned parquet dataset."""
+    with mock_aws():
+        client = boto3.client("s3", region_name="eu-west-2")
+        for bucket in ("lake-bucket-test", "dest-bucket-test"):
+            client.create_bucket(
+                Bucket=bucket,
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+        for i, partition in enumerate(PARTITIONS):
+            df = pd.DataFrame(
+                {
+                    "student_id": [1000 + 10 * i, 1001 + 10 * i],
+                    "name": ["John Smith", "Jane Doe"],
+                    "course": ["Software", "Data Science"],
+                }
+            )
+            wr.s3.to_parquet(
+                df=df,
+                path=f"s3://lake-bucket-test/students/{partition}/part-0.parquet",
+                index=False,
+            )
+        client.put_object(Bucket="lake-bucket-test", Key="students/_SUCCESS", Body=b"")
+        # metadata and temporary files of the writers are not partitions
+        for key in (
+            "students/_delta_log/00000000000000000000.json",
+            "students/_manifest.json",
+            "students/year=2024/month=01/.part-1.parquet",
+        ):
+            client.put_object(Bucket="lake-bucket-test", Key=key, Body=b"{}")
+        yield client
+
+
+class TestDatasetMode:
+    def test_dataset_is_obfuscated_with_mirrored_layout_and_manifest(self, s3_client):
+        with patch.object(
+            obfuscator_lib,
+            "_detect_primary_key",
+            wraps=obfuscator_lib._detect_primary_key,
+        ) as detect:
+            manifest = obfuscate_dataset(
+                "s3://lake-bucket-test/students",
+                "s3://dest-bucket-test/obfuscated/students/",
+                ["name"],
+                s3_client=s3_client,
+            )
+
+        # primary key detection runs once per dataset, not per partition
+        assert detect.call_count == 1
+        assert manifest["plan"]["primary_key"] == "student_id"
+        assert manifest["plan"]["obfuscated_fields"] == ["name"]
+        assert manifest["rows"] == 6
+        assert len(manifest["partitions"]) == 3
+
+        for partition in PARTITIONS:
+            result_df = wr.s3.read_parquet(
+                f"s3://dest-bucket-test/obfuscated/students/{partition}/part-0.parquet"
+            )
+            assert list(result_df["name"]) == ["***", "***"]
+            assert list(result_df["course"]) == ["Software", "Data Science"]
+
+        stored_manifest = json.loads(
+            s3_client.get_object(
+                Bucket="dest-bucket-test", Key="obfuscated/students/_manifest.json"
+            )["Body"].read()
+        )
+        assert stored_manifest == manifest
+
+    def test_partition_with_different_schema_fails_dataset(self, s3_client):
+        wr.s3.to_parquet(
+            df=pd.DataFrame({"student_id": [2000], "name": ["Ann Lee"]}),
+            path="s3://lake-bucket-test/students/year=2024/month=04/part-0.parquet",
+            index=False,
+        )
+
+        with pytest.raises(Exception) as excinfo:
+            obfuscate_dataset(
+                "s3://lake-bucket-test/students/",
+                "s3://dest-bucket-test/obfuscated/students/",
+                ["name"],
+                s3_client=s3_client,
+            )
+
+        assert "1 partition(s) failed" in str(excinfo.value)
+        assert "month=04" in str(excinfo.value)
+        # no manifest for an incomplete dataset
+        listing = s3_client.list_objects_v2(Bucket="dest-bucket-test")
+        keys = [item["Key"] for item in listing.get("Contents", [])]
+        assert "obfuscated/students/_manifest.json" not in keys
+
+    def test_empty_prefix_raises_error(self, s3_client):
+        with pytest.raises(ValueError) as excinfo:
+            obfuscate_dataset(
+                "s3://lake-bucket-test/staff/",
+                "s3://dest-bucket-test/obfuscated/staff/",
+                ["name"],
+                s3_client=s3_client,
+            )
+
+        assert "No partition files found" in str(excinfo.value)
+
+    def test_lambda_obfuscates_dataset_as_parquet_to_csv(self, s3_client, monkeypatch):
+        monkeypatch.setenv("DESTINATION_BUCKET", "dest-bucket-test")
+
+        response = lambda_handler(
+            {
+                "dataset_to_obfuscate": "s3://lake-bucket-test/students/",
+                "pii_fields": ["name"],
+                "output_format": "csv",
+            },
+            None,
+        )
+
+        assert response["manifest"] == (
+            "s3://dest-bucket-test/obfuscated/students/_manifest.json"
+        )
+        result_df = wr.s3.read_csv(
+            "s3://dest-bucket-test/obfuscated/students/year=2024/month=02/part-0.csv"
+        )
+        assert list(result_df["student_id"]) == [1010, 1011]
+        assert list(result_df["name"]) == ["***", "***"]
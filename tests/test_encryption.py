@@ -0,0 +1,182 @@
+import pytest
+import boto3
+import json
+import struct
+import pandas as pd
+from io import BytesIO
+from moto import mock_aws
+from src.utils import envelope_encryption, obfuscator_lib
+from src.utils.envelope_encryption import MAGIC, TAG_SIZE, decrypt_data
+from src.utils.obfuscator_lib import obfuscate_data
+from src.lambda_function import lambda_handler
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def small_segments(monkeypatch):
+    """Segments of 256 bytes, the sample output is encrypted in many segments."""
+    monkeypatch.setattr(envelope_encryption, "SEGMENT_SIZE", 256)
+
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    """Local csv file of 1000 rows."""
+    local_file = tmp_path / "students.csv"
+    pd.DataFrame(
+        {
+            "student_id": range(10_000, 11_000),
+            "name": [f"Student {i}" for i in range(1000)],
+            "course": ["Software", "Data Science", "DevOps", "Cloud"] * 250,
+        }
+    ).to_csv(local_file, index=False)
+    return local_file
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Yields mocked S3 and KMS clients, a KMS key and S3 parts of 1 KiB."""
+    monkeypatch.setattr(obfuscator_lib, "MULTIPART_PART_SIZE_MIN", 1024)
+    monkeypatch.setattr("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 1024)
+    with mock_aws():
+        s3_client = boto3.client("s3", region_name="eu-west-2")
+        for bucket in ("source-bucket-test", "dest-bucket-test"):
+            s3_client.create_bucket(
+                Bucket=bucket,
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+        kms_client = boto3.client("kms", region_name="eu-west-2")
+        key_id = kms_client.create_key()["KeyMetadata"]["KeyId"]
+        yield s3_client, kms_client, key_id
+
+
+def _segments(encrypted):
+    """Splits an encrypted stream into its header and its segments."""
+    magic_end = len(MAGIC)
+    header_start = magic_end + 4
+    header_length = struct.unpack(">I", encrypted[magic_end:header_start])[0]
+    header_end = header_start + header_length
+    header = json.loads(encrypted[header_start:header_end])
+    body = BytesIO(encrypted[header_end:])
+    block_size = header["segment_size"] + TAG_SIZE
+    segments = list(iter(lambda: body.read(block_size), b""))
+    return encrypted[:header_end], header, segments
+
+
+class TestEnvelopeEncryption:
+    def test_encrypted_output_decrypts_to_plain_output(
+        self, sample_csv, aws, small_segments
+    ):
+        _, kms_client, key_id = aws
+        report = {}
+
+        encrypted = obfuscate_data(
+            sample_csv,
+            ["name"],
+            chunksize=100,
+            kms_key_id=key_id,
+            kms_client=kms_client,
+            report=report,
+        ).getvalue()
+
+        plain = obfuscate_data(sample_csv, ["name"]).getvalue()
+        assert encrypted.startswith(MAGIC)
+        assert b"Student" not in encrypted and b"Software" not in encrypted
+        assert decrypt_data(encrypted, kms_client).getvalue() == plain
+        _, header, segments = _segments(encrypted)
+        assert header["segment_size"] == 256
+        assert report["stages"]["encrypt"]["items"] == len(segments)
+        assert len(segments) == -(-len(plain) // 256)
+
+    def test_encryption_streams_into_multipart_upload(self, sample_csv, aws):
+        s3_client, kms_client, key_id = aws
+        destination = "s3://dest-bucket-test/obfuscated/students.csv"
+        report = {}
+
+        obfuscate_data(
+            sample_csv,
+            ["name"],
+            chunksize=100,
+            output=destination,
+            part_size=4096,
+            pipeline_depth=2,
+            s3_client=s3_client,
+            kms_key_id=key_id,
+            kms_client=kms_client,
+            report=report,
+        )
+
+        body = s3_client.get_object(
+            Bucket="dest-bucket-test", Key="obfuscated/students.csv"
+        )["Body"].read()
+        _, header, _ = _segments(body)
+        assert header["encryption_context"] == {"object": destination}
+        assert report["stages"]["upload"]["items"] > 1
+        result_df = pd.read_csv(decrypt_data(BytesIO(body), kms_client))
+        assert len(result_df) == 1000
+        assert (result_df["name"] == "***").all()
+
+    @pytest.mark.parametrize("tampering", ["modified", "truncated", "reordered"])
+    def test_tampered_data_fails_decryption(
+        self, sample_csv, aws, small_segments, tampering
+    ):
+        _, kms_client, key_id = aws
+        encrypted = obfuscate_data(
+            sample_csv, ["name"], kms_key_id=key_id, kms_client=kms_client
+        ).getvalue()
+        header, _, segments = _segments(encrypted)
+
+        if tampering == "modified":
+            segments[2] = bytes([segments[2][0] ^ 1]) + segments[2][1:]
+        elif tampering == "truncated":
+            segments = segments[:-1]
+        else:
+            segments[1], segments[2] = segments[2], segments[1]
+
+        with pytest.raises(ValueError) as excinfo:
+            decrypt_data(header + b"".join(segments), kms_client)
+
+        assert "failed authentication" in str(excinfo.value)
+
+    def test_missing_cryptography_raises_import_error(self, sample_csv, monkeypatch):
+        monkeypatch.setattr(envelope_encryption, "AESGCM", None)
+
+        with pytest.raises(ImportError) as excinfo:
+            obfuscate_data(sample_csv, ["name"], kms_key_id="alias/obfuscator")
+
+        assert "cryptography" in str(excinfo.value)
+
+    def test_lambda_uploads_encrypted_output(self, aws, monkeypatch):
+        s3_client, kms_client, key_id = aws
+        monkeypatch.setenv("DESTINATION_BUCKET", "dest-bucket-test")
+        monkeypatch.setenv("KMS_KEY_ID", key_id)
+        s3_client.put_object(
+            Bucket="source-bucket-test",
+            Key="new_data/students.csv",
+            Body=b"student_id,name\n1234,John Smith\n5678,Jane Doe\n",
+        )
+
+        response = lambda_handler(
+            {
+                "file_to_obfuscate": "s3://source-bucket-test/new_data/students.csv",
+                "pii_fields": ["name"],
+            },
+            None,
+        )
+
+        assert response["status"] == 200
+        body = s3_client.get_object(
+            Bucket="dest-bucket-test", Key="obfuscated/new_data/students.csv"
+        )["Body"].read()
+        assert body.startswith(MAGIC)
+        result_df = pd.read_csv(BytesIO(decrypt_data(body, kms_client).getvalue()))
+        assert list(result_df["name"]) == ["***", "***"]
+        assert response["integrity"]["verified"] is True
@@ -0,0 +1,167 @@
+import pytest
+import boto3
+import pandas as pd
+import pandas.testing as pdt
+from io import BytesIO
+from moto import mock_aws
+from src.utils import format_engines
+from src.utils.format_engines import (
+    CsvEngine,
+    detect_format,
+    get_engine,
+    register_engine,
+    supported_extensions,
+)
+from src.utils.obfuscator_lib import obfuscate_data
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame(
+        {
+            "student_id": range(10_000, 10_100),
+            "name": [f"Student {i}" for i in range(100)],
+            "course": ["Software", "Data Science", "DevOps", "Cloud"] * 25,
+        }
+    )
+
+
+@pytest.fixture
+def expected_df(sample_df):
+    expected_df = sample_df.copy()
+    expected_df["name"] = "***"
+    return expected_df
+
+
+@pytest.fixture
+def orc_bytes(sample_df):
+    buffer = BytesIO()
+    sample_df.to_orc(buffer, index=False)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def parquet_bytes(sample_df):
+    buffer = BytesIO()
+    sample_df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+class PipeEngine(CsvEngine):
+    """Pipe separated values, a custom engine plugged into the registry."""
+
+    name = "psv"
+    extensions = ("psv",)
+    sep = "|"
+
+
+class TestRegistry:
+    def test_engines_are_found_by_name_and_extension(self):
+        assert get_engine("csv").name == "csv"
+        assert get_engine(".PQ").name == "parquet"
+        assert get_engine("txt") is None
+        assert ".orc" in supported_extensions()
+        assert get_engine("json").describe()["chunkable"] is False
+        assert get_engine("orc").describe() == {
+            "name": "orc",
+            "extensions": ["orc"],
+            "chunkable": True,
+            "splittable": True,
+            "column_projection": True,
+            "arrow_native": True,
+            "text_native": False,
+        }
+
+    def test_formats_are_detected_by_magic_bytes(self, orc_bytes, parquet_bytes):
+        assert detect_format(parquet_bytes[:16]) == "parquet"
+        assert detect_format(orc_bytes[:16]) == "orc"
+        assert detect_format(b'  [{"name": "John Smith"}]') == "json"
+        assert detect_format(b"student_id,name\n") is None
+
+    def test_registered_engine_is_used_by_obfuscate_data(
+        self, tmp_path, monkeypatch, sample_df, expected_df
+    ):
+        monkeypatch.setattr(format_engines, "_ENGINES", dict(format_engines._ENGINES))
+        register_engine(PipeEngine())
+        local_file = tmp_path / "students.psv"
+        sample_df.to_csv(local_file, sep="|", index=False)
+
+        result = obfuscate_data(local_file, ["name"], chunksize=30)
+
+        assert result.getvalue().startswith(b"student_id|name|course\n")
+        pdt.assert_frame_equal(pd.read_csv(result, sep="|"), expected_df)
+
+
+class TestOrcEngine:
+    def test_orc_buffer_is_detected_and_obfuscated(self, orc_bytes, expected_df):
+        report = {}
+
+        result = obfuscate_data(orc_bytes, ["name"], report=report)
+
+        assert result.getvalue()[:3] == b"ORC"
+        pdt.assert_frame_equal(pd.read_orc(result), expected_df)
+        assert report["primary_key"] == "student_id"
+
+    def test_orc_is_streamed_in_chunks(self, tmp_path, sample_df, expected_df):
+        local_file = tmp_path / "students.orc"
+        sample_df.to_orc(local_file, index=False)
+        report = {}
+
+        result = obfuscate_data(
+            local_file, ["name"], chunksize=30, output_format="csv", report=report
+        )
+
+        assert report["chunks"] == 4
+        pdt.assert_frame_equal(pd.read_csv(result), expected_df)
+
+    def test_parquet_is_converted_to_orc(self, parquet_bytes, expected_df):
+        result = obfuscate_data(
+            parquet_bytes, ["name"], file_format="parquet", output_format="orc"
+        )
+
+        pdt.assert_frame_equal(pd.read_orc(result), expected_df)
+
+
+class TestSchemaProbe:
+    def test_s3_parquet_probe_reads_only_the_footer(self, parquet_bytes):
+        with mock_aws():
+            s3_client = boto3.client("s3", region_name="eu-west-2")
+            s3_client.create_bucket(
+                Bucket="source-bucket-test",
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+            s3_client.put_object(
+                Bucket="source-bucket-test",
+                Key="new_data/students.parquet",
+                Body=parquet_bytes,
+            )
+            ranges = []
+            s3_client.meta.events.register(
+                "provide-client-params.s3.GetObject",
+                lambda params, **kwargs: ranges.append(params.get("Range")),
+            )
+
+            schema = get_engine("parquet").probe_schema(
+                "s3://source-bucket-test/new_data/students.parquet", True, s3_client
+            )
+
+        assert schema.names == ["student_id", "name", "course"]
+        assert ranges and all(ranges)
+
+    def test_csv_probe_keeps_the_position_of_the_source(self, sample_df):
+        source = BytesIO(sample_df.to_csv(index=False).encode("utf-8"))
+
+        schema = get_engine("csv").probe_schema(source, False)
+
+        assert schema.names == ["student_id", "name", "course"]
+        assert source.tell() == 0
@@ -0,0 +1,217 @@
+import pytest
+import boto3
+import awswrangler as wr
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute  # noqa: F401
+from unittest.mock import patch
+from moto import mock_aws
+from src.utils import format_engines, obfuscator_lib
+from src.utils.obfuscator_lib import obfuscate_data
+from src.lambda_function import lambda_handler
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    """Local sample csv file."""
+    local_file = tmp_path / "students.csv"
+    pd.DataFrame(
+        {
+            "student_id": [1234, 5678, 9012, 3456],
+            "name": ["John Smith", "Jane Doe", "Ann Lee", "Bob Ray"],
+            "course": ["Software", "Data Science", "DevOps", "Cloud"],
+            "graduation_date": ["2024-03-31", "2024-01-15", "2024-03-31", None],
+        }
+    ).to_csv(local_file, index=False)
+    return local_file
+
+
+class TestIntegrityVerification:
+    def test_report_contains_verified_integrity(self, sample_csv):
+        report = {}
+
+        obfuscate_data(sample_csv, ["name"], verify_integrity=True, report=report)
+
+        integrity = report["integrity"]
+        assert integrity["verified"] is True
+        assert integrity["rows_in"] == integrity["rows_out"] == 4
+        assert integrity["columns"] == [
+            "student_id",
+            "name",
+            "course",
+            "graduation_date",
+        ]
+        # only the untouched columns are checksummed
+        assert set(integrity["checksums"]) == {
+            "student_id",
+            "course",
+            "graduation_date",
+        }
+        assert report["rows"] == 4
+        assert report["obfuscated_fields"] == ["name"]
+
+    def test_integrity_is_rolled_over_all_chunks(self, sample_csv):
+        report = {}
+
+        obfuscate_data(
+            sample_csv, ["name"], chunksize=3, verify_integrity=True, report=report
+        )
+
+        assert report["chunks"] == 2
+        assert report["integrity"]["verified"] is True
+        assert report["integrity"]["rows_in"] == report["integrity"]["rows_out"] == 4
+
+    def test_modified_non_pii_column_fails_integrity_check(self, sample_csv):
+        original = obfuscator_lib._obfuscate_frame
+
+        def faulty_obfuscate_frame(df, obf_pii_fields, strategy="mask", vault=None):
+            original(df, obf_pii_fields, strategy, vault)
+            df["course"] = df["course"].str.upper()
+
+        with patch.object(obfuscator_lib, "_obfuscate_frame", faulty_obfuscate_frame):
+            with pytest.raises(ValueError) as excinfo:
+                obfuscate_data(sample_csv, ["name"], verify_integrity=True)
+
+        assert "Integrity check failed" in str(excinfo.value)
+        assert "mismatched columns: ['course']" in str(excinfo.value)
+
+    def test_dropped_row_fails_integrity_check(self, sample_csv):
+        original = obfuscator_lib._obfuscate_frame
+
+        def dropping_obfuscate_frame(df, obf_pii_fields, strategy="mask", vault=None):
+            original(df, obf_pii_fields, strategy, vault)
+            df.drop(df.index[-1], inplace=True)
+
+        with patch.object(obfuscator_lib, "_obfuscate_frame", dropping_obfuscate_frame):
+            with pytest.raises(ValueError) as excinfo:
+                obfuscate_data(sample_csv, ["name"], verify_integrity=True)
+
+        assert "rows 4 -> 3" in str(excinfo.value)
+
+
+class TestWriteSideIntegrity:
+    def test_csv_values_are_copied_as_source_text(self, tmp_path):
+        local_file = tmp_path / "scores.csv"
+        local_file.write_text(
+            "student_id,name,score,grade\n"
+            "1234,John Smith,5,007\n"
+            "5678,Jane Doe,,1.50\n"
+            "9012,Ann Lee,7,NA\n"
+        )
+        report = {}
+
+        result = obfuscate_data(
+            local_file, ["name"], chunksize=2, verify_integrity=True, report=report
+        )
+
+        assert result.getvalue().decode("utf-8").splitlines() == [
+            "student_id,name,score,grade",
+            "1234,***,5,007",
+            "5678,***,,1.50",
+            "9012,***,7,NA",
+        ]
+        assert report["integrity"]["verified"] is True
+
+    def test_value_changed_by_csv_writer_fails_integrity_check(
+        self, sample_csv, monkeypatch
+    ):
+        original = format_engines._CsvWriter._format
+
+        def faulty_format(self, df):
+            fields = original(self, df)
+            return fields.assign(course=fields["course"].str.upper())
+
+        monkeypatch.setattr(format_engines._CsvWriter, "_format", faulty_format)
+
+        with pytest.raises(ValueError) as excinfo:
+            obfuscate_data(sample_csv, ["name"], verify_integrity=True)
+
+        assert "mismatched columns: ['course']" in str(excinfo.value)
+
+    def test_value_changed_by_parquet_writer_fails_integrity_check(
+        self, sample_csv, monkeypatch
+    ):
+        original = format_engines._ArrowWriter._to_table
+
+        def faulty_to_table(self, frame):
+            table = original(self, frame)
+            index = table.schema.get_field_index("student_id")
+            return table.set_column(
+                index, "student_id", pa.compute.add(table.column(index), 1)
+            )
+
+        monkeypatch.setattr(format_engines._ArrowWriter, "_to_table", faulty_to_table)
+
+        with pytest.raises(ValueError) as excinfo:
+            obfuscate_data(
+                sample_csv, ["name"], output_format="parquet", verify_integrity=True
+            )
+
+        assert "mismatched columns: ['student_id']" in str(excinfo.value)
+
+    @pytest.mark.parametrize("output_format", ["csv", "json", "parquet", "orc"])
+    def test_converted_outputs_are_verified(self, tmp_path, output_format):
+        local_file = tmp_path / "students.parquet"
+        pd.DataFrame(
+            {
+                "student_id": range(10_000, 10_006),
+                "name": [f"Student {i}" for i in range(6)],
+                "score": [0.1, 2.5, None, 1 / 3, 7.0, 1e-7],
+                # ints in the first chunk, nulls in the later ones (cast to double)
+                "credits": pd.array([30, 60, None, 90, None, 120], dtype="Int64"),
+                "graduation_date": pd.to_datetime(["2024-03-31"] * 5 + [None]),
+            }
+        ).to_parquet(local_file, index=False)
+        report = {}
+
+        obfuscate_data(
+            local_file,
+            ["name"],
+            chunksize=2,
+            output_format=output_format,
+            verify_integrity=True,
+            report=report,
+        )
+
+        assert report["integrity"]["verified"] is True
+        assert report["integrity"]["rows_out"] == 6
+
+
+@mock_aws
+class TestLambdaIntegrity:
+    def test_lambda_stores_integrity_as_object_metadata(self, monkeypatch, sample_csv):
+        s3_client = boto3.client("s3", region_name="eu-west-2")
+        for bucket in ("source-bucket-test", "dest-bucket-test"):
+            s3_client.create_bucket(
+                Bucket=bucket,
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+        monkeypatch.setenv("DESTINATION_BUCKET", "dest-bucket-test")
+        wr.s3.upload(
+            local_file=str(sample_csv), path="s3://source-bucket-test/data.csv"
+        )
+
+        response = lambda_handler(
+            {
+                "file_to_obfuscate": "s3://source-bucket-test/data.csv",
+                "pii_fields": ["name"],
+            },
+            None,
+        )
+
+        metadata = s3_client.head_object(
+            Bucket="dest-bucket-test", Key="obfuscated/data.csv"
+        )["Metadata"]
+        assert metadata["integrity-verified"] == "true"
+        assert metadata["integrity-rows"] == "4"
+        assert metadata["integrity-checksum"] == response["integrity"]["checksum"]
@@ -0,0 +1,243 @@
+import pytest
+import boto3
+import tracemalloc
+import awswrangler as wr
+import pandas as pd
+import pyarrow.parquet as pq
+from moto import mock_aws
+from src.utils import format_engines, obfuscator_lib
+from src.utils.obfuscator_lib import obfuscate_data
+from src.lambda_function import lambda_handler
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def sample_df():
+    rows = 20_000
+    return pd.DataFrame(
+        {
+            "student_id": range(100_000, 100_000 + rows),
+            "name": [f"Student {i}" for i in range(rows)],
+            "course": ["Software", "Data Science", "DevOps", "Cloud"] * (rows // 4),
+        }
+    )
+
+
+@pytest.fixture
+def sample_csv(tmp_path, sample_df):
+    """Local csv file of 20000 rows (~0.6 MB)."""
+    local_file = tmp_path / "students.csv"
+    sample_df.to_csv(local_file, index=False)
+    return local_file
+
+
+@pytest.fixture
+def idle_process(monkeypatch):
+    """The RSS of the test process stays far below any budget."""
+    monkeypatch.setattr(obfuscator_lib, "_current_rss_bytes", lambda: 0)
+
+
+class TestMemoryBudget:
+    def test_big_source_is_moved_to_streaming_engine(self, sample_csv, idle_process):
+        report = {}
+
+        result = obfuscate_data(sample_csv, ["name"], memory_budget_mb=2, report=report)
+
+        memory = report["memory"]
+        assert memory["engine"] == "streaming"
+        assert memory["switched_engine"] is True
+        # the first chunk probes the row size, then one chunk takes ~10% of the budget
+        assert memory["chunksize_initial"] == 1000
+        assert 1000 <= memory["chunksize_final"] < 20_000
+        assert report["chunks"] > 1
+        expected = obfuscate_data(sample_csv, ["name"])
+        assert result.getvalue() == expected.getvalue()
+
+    @pytest.mark.parametrize(
+        "source",
+        ["local.parquet", "s3://source-bucket-test/students.csv", "s3.parquet"],
+    )
+    def test_switched_run_grows_the_chunks_it_reads(
+        self, sample_df, tmp_path, idle_process, monkeypatch, source
+    ):
+        read_rows = []
+        observe = obfuscator_lib._MemoryGovernor.observe
+
+        def record(governor, df):
+            read_rows.append(len(df))
+            observe(governor, df)
+
+        monkeypatch.setattr(obfuscator_lib._MemoryGovernor, "observe", record)
+        report = {}
+
+        with mock_aws():
+            boto3.client("s3", region_name="eu-west-2").create_bucket(
+                Bucket="source-bucket-test",
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+            if source == "local.parquet":
+                source = tmp_path / "students.parquet"
+                sample_df.to_parquet(source, index=False, row_group_size=1000)
+            elif source == "s3.parquet":
+                source = "s3://source-bucket-test/students.parquet"
+                wr.s3.to_parquet(sample_df, source, index=False)
+            else:
+                wr.s3.to_csv(sample_df, source, index=False)
+
+            obfuscate_data(source, ["name"], memory_budget_mb=2, report=report)
+
+        memory = report["memory"]
+        assert memory["switched_engine"] is True
+        assert read_rows[0] == 1000
+        # the chunks grow past the size the reader was opened with
+        assert max(read_rows) > 1000
+        assert sum(read_rows) == 20_000
+        # the last chunk read at full size, the very last one is the rest of the file
+        assert read_rows[-1] < read_rows[-2]
+        assert memory["chunksize_final"] == read_rows[-2]
+
+    def test_parquet_row_groups_are_written_within_budget(
+        self, sample_csv, idle_process, monkeypatch
+    ):
+        buffered = []
+        flush = format_engines._ParquetWriter._flush_row_groups
+
+        def record(writer):
+            buffered.append(sum(table.nbytes for table in writer._pending_tables))
+            flush(writer)
+
+        monkeypatch.setattr(format_engines._ParquetWriter, "_flush_row_groups", record)
+        report = {}
+
+        result = obfuscate_data(
+            sample_csv,
+            ["name"],
+            output_format="parquet",
+            row_group_size=1_000_000,
+            memory_budget_mb=2,
+            report=report,
+        )
+
+        assert report["memory"]["switched_engine"] is True
+        # the writer holds about one chunk, not the whole file below row_group_size
+        chunk_budget = 2 * obfuscator_lib.MB * obfuscator_lib.CHUNK_BUDGET_SHARE
+        assert max(buffered) < 2 * chunk_budget
+        parquet_file = pq.ParquetFile(result)
+        assert parquet_file.metadata.num_row_groups > 1
+        assert parquet_file.metadata.num_rows == 20_000
+
+    def test_small_source_stays_in_memory(self, sample_csv, idle_process):
+        report = {}
+
+        obfuscate_data(sample_csv, ["name"], memory_budget_mb=512, report=report)
+
+        assert report["memory"]["engine"] == "in-memory"
+        assert report["memory"]["switched_engine"] is False
+        assert report["chunks"] == 1
+
+    def test_memory_pressure_halves_chunk_size(self, sample_csv, monkeypatch):
+        monkeypatch.setattr(obfuscator_lib, "_current_rss_bytes", lambda: 10**12)
+        report = {}
+
+        obfuscate_data(
+            sample_csv, ["name"], chunksize=8000, memory_budget_mb=512, report=report
+        )
+
+        # chunks of 8000, 4000, 2000 rows, then 1000 (minimum) rows
+        assert report["memory"]["chunksize_final"] == 1000
+        assert report["memory"]["chunk_adjustments"] == 3
+        assert report["rows"] == 20_000
+        assert report["chunks"] == 3 + 6
+
+    def test_json_source_is_never_chunked(self, tmp_path, sample_df, idle_process):
+        local_file = tmp_path / "students.json"
+        sample_df.to_json(local_file, orient="records")
+        report = {}
+
+        obfuscate_data(local_file, ["name"], memory_budget_mb=1, report=report)
+
+        assert report["memory"]["engine"] == "in-memory"
+        assert report["chunks"] == 1
+
+
+class TestMemoryProfiling:
+    def test_stages_report_traced_and_rss_peaks(self, sample_csv):
+        report = {}
+
+        obfuscate_data(
+            sample_csv, ["name"], chunksize=5000, profile_memory=True, report=report
+        )
+
+        for stage in ("read", "mask"):
+            assert report["stages"][stage]["peak_traced_mb"] > 0
+            assert report["stages"][stage]["peak_rss_mb"] > 0
+        memory = report["memory"]
+        assert memory["peak_traced_mb"] > 0
+        assert memory["peak_rss_mb"] > 0
+        assert memory["recommended_memory_size_mb"] >= 128
+        assert memory["recommended_memory_size_mb"] % 64 == 0
+        assert "budget_mb" not in memory
+        assert not tracemalloc.is_tracing()
+
+    def test_overlapping_steps_keep_their_peaks(self):
+        reader = obfuscator_lib._StageStats(profile_memory=True)
+        masking = obfuscator_lib._StageStats(profile_memory=True)
+        obfuscator_lib._TRACING.start()
+        try:
+            with reader.measure():
+                chunk = bytearray(10 * obfuscator_lib.MB)
+                del chunk
+                # a step of another stage starts while the first one runs
+                with masking.measure():
+                    pass
+        finally:
+            obfuscator_lib._TRACING.stop()
+
+        assert reader.peak_traced_bytes > 9 * obfuscator_lib.MB
+        assert not tracemalloc.is_tracing()
+
+    def test_run_ending_first_does_not_stop_tracing_of_another(self, sample_csv):
+        # another run is still profiling
+        obfuscator_lib._TRACING.start()
+        try:
+            obfuscate_data(sample_csv, ["name"], profile_memory=True)
+            assert tracemalloc.is_tracing()
+        finally:
+            obfuscator_lib._TRACING.stop()
+
+        assert not tracemalloc.is_tracing()
+
+    def test_lambda_returns_memory_report(self, sample_df, monkeypatch):
+        with mock_aws():
+            s3_client = boto3.client("s3", region_name="eu-west-2")
+            for bucket in ("source-bucket-test", "dest-bucket-test"):
+                s3_client.create_bucket(
+                    Bucket=bucket,
+                    CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+                )
+            monkeypatch.setenv("DESTINATION_BUCKET", "dest-bucket-test")
+            monkeypatch.setenv("MEMORY_BUDGET_MB", "409")
+            monkeypatch.setenv("PROFILE_MEMORY", "true")
+            wr.s3.to_csv(
+                df=sample_df, path="s3://source-bucket-test/data.csv", index=False
+            )
+
+            response = lambda_handler(
+                {
+                    "file_to_obfuscate": "s3://source-bucket-test/data.csv",
+                    "pii_fields": ["name"],
+                },
+                None,
+            )
+
+        assert response["memory"]["budget_mb"] == 409
+        assert "recommended_memory_size_mb" in response["memory"]
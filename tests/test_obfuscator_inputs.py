@@ -0,0 +1,78 @@
+import pytest
+import pandas as pd
+import pandas.testing as pdt
+from io import BytesIO
+from src.utils.obfuscator_lib import obfuscate_data
+
+
+@pytest.fixture
+def sample_df():
+    """Base sample data for the in-process API tests."""
+    return pd.DataFrame(
+        {
+            "student_id": [1234, 5678],
+            "name": ["John Smith", "Jane Doe"],
+            "course": ["Software", "Data Science"],
+            "email_address": ["j.smith@email.com", "j.doe@email.com"],
+        }
+    )
+
+
+@pytest.fixture
+def expected_df(sample_df):
+    """Sample data with the PII fields masked."""
+    expected = sample_df.copy()
+    expected["name"] = "***"
+    expected["email_address"] = "***"
+    return expected
+
+
+class TestObfuscatorInProcessInputs:
+    def test_obfuscates_csv_bytes(self, sample_df, expected_df):
+        data = sample_df.to_csv(index=False).encode("utf-8")
+
+        result = obfuscate_data(data, ["name", "email_address"], file_format="csv")
+
+        pdt.assert_frame_equal(pd.read_csv(result), expected_df)
+
+    def test_obfuscates_parquet_memoryview(self, sample_df, expected_df):
+        buffer = BytesIO()
+        sample_df.to_parquet(buffer, index=False)
+
+        result = obfuscate_data(
+            buffer.getbuffer(), ["name", "email_address"], file_format="parquet"
+        )
+
+        pdt.assert_frame_equal(pd.read_parquet(result), expected_df)
+
+    def test_obfuscates_json_file_like_object(self, sample_df, expected_df):
+        data = BytesIO(sample_df.to_json(orient="records").encode("utf-8"))
+
+        result = obfuscate_data(data, ["name", "email_address"], file_format="JSON")
+
+        pdt.assert_frame_equal(pd.read_json(result, orient="records"), expected_df)
+
+    def test_obfuscates_local_path(self, tmp_path, sample_df, expected_df):
+        local_file = tmp_path / "students.csv"
+        sample_df.to_csv(local_file, index=False)
+
+        # both str and pathlib.Path are accepted, the format comes from the extension
+        result_from_path = obfuscate_data(local_file, ["name", "email_address"])
+        result_from_str = obfuscate_data(str(local_file), ["name", "email_address"])
+
+        pdt.assert_frame_equal(pd.read_csv(result_from_path), expected_df)
+        pdt.assert_frame_equal(pd.read_csv(result_from_str), expected_df)
+
+    def test_buffer_without_file_format_raises_error(self, sample_df):
+        data = sample_df.to_csv(index=False).encode("utf-8")
+
+        with pytest.raises(ValueError) as excinfo:
+            obfuscate_data(data, ["name", "email_address"])
+
+        assert "file_format must be given" in str(excinfo.value)
+
+    def test_unsupported_source_type_raises_error(self):
+        with pytest.raises(TypeError) as excinfo:
+            obfuscate_data(12345, ["name"], file_format="csv")
+
+        assert "Unsupported source type: int" in str(excinfo.value)
@@ -0,0 +1,151 @@
+import pytest
+import boto3
+import awswrangler as wr
+import pandas as pd
+import pandas.testing as pdt
+import pyarrow.parquet as pq
+from moto import mock_aws
+from src.utils.obfuscator_lib import obfuscate_data
+from src.lambda_function import lambda_handler
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def sample_df():
+    """Sample data with a few hundred rows to fill several row groups."""
+    rows = 300
+    return pd.DataFrame(
+        {
+            "student_id": range(1000, 1000 + rows),
+            "name": [f"Student {i}" for i in range(rows)],
+            "course": ["Software", "Data Science", "DevOps"] * (rows // 3),
+            "email_address": [f"student{i}@email.com" for i in range(rows)],
+        }
+    )
+
+
+@pytest.fixture
+def expected_df(sample_df):
+    """Sample data with the PII fields masked."""
+    expected = sample_df.copy()
+    expected["name"] = "***"
+    expected["email_address"] = "***"
+    return expected
+
+
+class TestOutputFormatConversion:
+    def test_csv_written_as_compressed_parquet(self, sample_df, expected_df):
+        data = sample_df.to_csv(index=False).encode("utf-8")
+
+        result = obfuscate_data(
+            data,
+            ["name", "email_address"],
+            file_format="csv",
+            output_format="parquet",
+            compression="zstd",
+            row_group_size=100,
+        )
+
+        parquet_file = pq.ParquetFile(result)
+        assert parquet_file.metadata.num_row_groups == 3
+        column_meta = parquet_file.metadata.row_group(0).column(1)
+        assert column_meta.compression == "ZSTD"
+        # masked columns are dictionary encoded
+        assert "RLE_DICTIONARY" in column_meta.encodings
+        pdt.assert_frame_equal(parquet_file.read().to_pandas(), expected_df)
+
+    def test_chunked_csv_reaches_target_row_group_size(
+        self, tmp_path, sample_df, expected_df
+    ):
+        local_file = tmp_path / "students.csv"
+        sample_df.to_csv(local_file, index=False)
+
+        # 30 chunks of 10 rows are buffered into row groups of 150 rows
+        result = obfuscate_data(
+            local_file,
+            ["name", "email_address"],
+            chunksize=10,
+            output_format="parquet",
+            row_group_size=150,
+        )
+
+        parquet_file = pq.ParquetFile(result)
+        assert parquet_file.metadata.num_row_groups == 2
+        assert parquet_file.metadata.row_group(0).num_rows == 150
+        pdt.assert_frame_equal(parquet_file.read().to_pandas(), expected_df)
+
+    def test_json_written_as_csv(self, sample_df, expected_df):
+        data = sample_df.to_json(orient="records").encode("utf-8")
+
+        result = obfuscate_data(
+            data, ["name", "email_address"], file_format="json", output_format="csv"
+        )
+
+        pdt.assert_frame_equal(pd.read_csv(result), expected_df)
+
+    @pytest.mark.parametrize("output_format", ["csv", "json", "parquet"])
+    def test_detected_primary_key_does_not_depend_on_output_format(self, output_format):
+        data = b"score,student_id,name\n1.5,101,a\n2.5,102,b\n3.5,103,c\n"
+        report = {}
+
+        obfuscate_data(
+            data,
+            ["name"],
+            file_format="csv",
+            output_format=output_format,
+            report=report,
+        )
+
+        assert report["primary_key"] == "student_id"
+
+    def test_unsupported_output_format_raises_error(self, sample_df):
+        data = sample_df.to_csv(index=False).encode("utf-8")
+
+        with pytest.raises(Exception) as excinfo:
+            obfuscate_data(data, ["name"], file_format="csv", output_format="xml")
+
+        assert "Unsupported output format: xml" in str(excinfo.value)
+
+
+@mock_aws
+class TestLambdaOutputFormat:
+    def test_lambda_writes_parquet_from_env_config(
+        self, monkeypatch, sample_df, expected_df
+    ):
+        s3_client = boto3.client("s3", region_name="eu-west-2")
+        for bucket in ("source-bucket-test", "dest-bucket-test"):
+            s3_client.create_bucket(
+                Bucket=bucket,
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+        monkeypatch.setenv("DESTINATION_BUCKET", "dest-bucket-test")
+        monkeypatch.setenv("OUTPUT_FORMAT", "parquet")
+        monkeypatch.setenv("PARQUET_COMPRESSION", "zstd")
+
+        wr.s3.to_csv(
+            df=sample_df, path="s3://source-bucket-test/new_data/data.csv", index=False
+        )
+
+        mock_event = {
+            "file_to_obfuscate": "s3://source-bucket-test/new_data/data.csv",
+            "pii_fields": ["name", "email_address"],
+            "row_group_size": 100,
+        }
+        lambda_handler(mock_event, None)
+
+        # the output key follows the new format
+        result_df = wr.s3.read_parquet(
+            "s3://dest-bucket-test/obfuscated/new_data/data.parquet"
+        )
+        # dtype alignment
+        result_df = result_df.astype(expected_df.dtypes)
+        pdt.assert_frame_equal(result_df, expected_df)
@@ -0,0 +1,153 @@
+import pytest
+import boto3
+import json
+import awswrangler as wr
+import pandas as pd
+from unittest.mock import patch
+from moto import mock_aws
+from src import lambda_function
+from src.lambda_function import lambda_handler, load_pii_rules, match_pii_rule
+
+RULES = {
+    "rules": [
+        {"prefix": "new_data/", "pii_fields": ["name"]},
+        {
+            "prefix": "new_data/students/",
+            "pii_fields": ["name", "email_address"],
+            "primary_key": "student_id",
+            "output_format": "parquet",
+        },
+    ]
+}
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture(autouse=True)
+def empty_rules_cache():
+    """Every test starts with a cold Lambda container."""
+    lambda_function._PII_RULES_CACHE.update(
+        uri=None, etag=None, rules=None, checked_at=0.0
+    )
+
+
+@pytest.fixture
+def s3_client():
+    """Yields a mocked S3 client with a config bucket holding the rules."""
+    with mock_aws():
+        client = boto3.client("s3", region_name="eu-west-2")
+        for bucket in ("config-bucket-test", "source-bucket-test", "dest-bucket-test"):
+            client.create_bucket(
+                Bucket=bucket,
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+        client.put_object(
+            Bucket="config-bucket-test", Key="pii_rules.json", Body=json.dumps(RULES)
+        )
+        yield client
+
+
+class TestPiiRules:
+    def test_match_pii_rule_prefers_longest_prefix(self):
+        rules = RULES["rules"]
+
+        assert match_pii_rule(rules, "new_data/students/a.csv")["primary_key"] == (
+            "student_id"
+        )
+        assert match_pii_rule(rules, "new_data/staff/a.csv")["pii_fields"] == ["name"]
+        assert match_pii_rule(rules, "other/a.csv") is None
+
+    def test_rules_are_cached_within_ttl(self, s3_client):
+        uri = "s3://config-bucket-test/pii_rules.json"
+
+        with patch.object(s3_client, "get_object", wraps=s3_client.get_object) as get:
+            first = load_pii_rules(s3_client, uri, ttl_seconds=300)
+            second = load_pii_rules(s3_client, uri, ttl_seconds=300)
+
+        assert first == second == RULES["rules"]
+        assert get.call_count == 1
+
+    def test_expired_rules_are_revalidated_with_etag(self, s3_client):
+        uri = "s3://config-bucket-test/pii_rules.json"
+        load_pii_rules(s3_client, uri, ttl_seconds=0)
+
+        # unchanged config: conditional GET answers 304, the cached rules are reused
+        with patch.object(s3_client, "get_object", wraps=s3_client.get_object) as get:
+            rules = load_pii_rules(s3_client, uri, ttl_seconds=0)
+        assert rules == RULES["rules"]
+        assert "IfNoneMatch" in get.call_args.kwargs
+
+        # changed config: downloaded again
+        new_rules = {"rules": [{"prefix": "", "pii_fields": ["email_address"]}]}
+        s3_client.put_object(
+            Bucket="config-bucket-test",
+            Key="pii_rules.json",
+            Body=json.dumps(new_rules),
+        )
+        assert load_pii_rules(s3_client, uri, ttl_seconds=0) == new_rules["rules"]
+
+    def test_invalid_rules_config_raises_error(self, s3_client):
+        s3_client.put_object(
+            Bucket="config-bucket-test", Key="bad.json", Body=json.dumps({"x": []})
+        )
+
+        with pytest.raises(ValueError) as excinfo:
+            load_pii_rules(s3_client, "s3://config-bucket-test/bad.json")
+
+        assert "must be a list of rules with 'prefix'" in str(excinfo.value)
+
+    def test_lambda_applies_prefix_rule_to_eventbridge_event(
+        self, s3_client, monkeypatch
+    ):
+        monkeypatch.setenv("DESTINATION_BUCKET", "dest-bucket-test")
+        monkeypatch.setenv("PII_RULES_URI", "s3://config-bucket-test/pii_rules.json")
+        monkeypatch.setenv("PII_FIELDS", "course")
+        df_input = pd.DataFrame(
+            {
+                "student_id": [1234, 5678],
+                "name": ["John Smith", "Jane Doe"],
+                "course": ["Software", "Data Science"],
+                "email_address": ["j.smith@email.com", "j.doe@email.com"],
+            }
+        )
+        wr.s3.to_csv(
+            df=df_input,
+            path="s3://source-bucket-test/new_data/students/test.csv",
+            index=False,
+        )
+
+        eventbridge_event = {
+            "detail": {
+                "bucket": {"name": "source-bucket-test"},
+                "object": {"key": "new_data/students/test.csv"},
+            }
+        }
+        lambda_handler(eventbridge_event, None)
+
+        # the rule wins over the PII_FIELDS env variable and converts to parquet
+        result_df = wr.s3.read_parquet(
+            "s3://dest-bucket-test/obfuscated/new_data/students/test.parquet"
+        )
+        assert list(result_df["name"]) == ["***", "***"]
+        assert list(result_df["email_address"]) == ["***", "***"]
+        assert list(result_df["course"]) == ["Software", "Data Science"]
+
+    def test_lambda_raises_error_on_unsupported_strategy(self, s3_client):
+        mock_event = {
+            "file_to_obfuscate": "s3://source-bucket-test/new_data/test.csv",
+            "pii_fields": ["name"],
+            "strategy": "shuffle",
+        }
+
+        with pytest.raises(ValueError) as excinfo:
+            lambda_handler(mock_event, None)
+
+        assert "Unsupported strategy: shuffle" in str(excinfo.value)
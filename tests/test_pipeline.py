@@ -0,0 +1,152 @@
+import pytest
+import boto3
+import threading
+import time
+import pandas as pd
+from io import BytesIO
+from moto import mock_aws
+from src.utils import obfuscator_lib
+from src.utils.obfuscator_lib import obfuscate_data
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    """Local csv file of 1000 rows."""
+    local_file = tmp_path / "students.csv"
+    pd.DataFrame(
+        {
+            "student_id": range(10_000, 11_000),
+            "name": [f"Student {i}" for i in range(1000)],
+            "course": ["Software", "Data Science", "DevOps", "Cloud"] * 250,
+        }
+    ).to_csv(local_file, index=False)
+    return local_file
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    """Yields a mocked S3 client, multipart parts of 1 KiB are accepted."""
+    monkeypatch.setattr(obfuscator_lib, "MULTIPART_PART_SIZE_MIN", 1024)
+    monkeypatch.setattr("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 1024)
+    with mock_aws():
+        client = boto3.client("s3", region_name="eu-west-2")
+        client.create_bucket(
+            Bucket="dest-bucket-test",
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        yield client
+
+
+class TestPipeline:
+    def test_pipelined_output_matches_sequential_output(self, sample_csv):
+        sequential = obfuscate_data(sample_csv, ["name"], chunksize=100)
+        report = {}
+
+        pipelined = obfuscate_data(
+            sample_csv, ["name"], chunksize=100, pipeline_depth=2, report=report
+        )
+
+        assert pipelined.getvalue() == sequential.getvalue()
+        assert set(report["stages"]) == {"read", "mask"}
+        assert report["stages"]["read"]["items"] == 10
+        assert report["stages"]["mask"]["items"] == 10
+        assert 0 <= report["stages"]["mask"]["utilization"] <= 1
+        assert report["bottleneck"] in ("read", "mask")
+
+    def test_s3_output_is_streamed_as_multipart_upload(self, sample_csv, s3_client):
+        report = {}
+
+        result = obfuscate_data(
+            sample_csv,
+            ["name"],
+            chunksize=100,
+            output="s3://dest-bucket-test/obfuscated/students.csv",
+            part_size=4096,
+            pipeline_depth=2,
+            s3_client=s3_client,
+            report=report,
+        )
+
+        assert result == "s3://dest-bucket-test/obfuscated/students.csv"
+        body = s3_client.get_object(
+            Bucket="dest-bucket-test", Key="obfuscated/students.csv"
+        )["Body"].read()
+        result_df = pd.read_csv(BytesIO(body))
+        assert len(result_df) == 1000
+        assert (result_df["name"] == "***").all()
+        assert report["stages"]["upload"]["items"] == -(-len(body) // 4096)
+        assert report["stages"]["upload"]["items"] > 1
+
+    def test_inline_upload_time_is_not_taken_from_mask_time(
+        self, sample_csv, s3_client
+    ):
+        # the output fits in one part, uploaded by complete() after the masking
+        s3_client.meta.events.register(
+            "before-call.s3.UploadPart", lambda **kwargs: time.sleep(0.2)
+        )
+        report = {}
+
+        obfuscate_data(
+            sample_csv,
+            ["name"],
+            output="s3://dest-bucket-test/obfuscated/students.csv",
+            s3_client=s3_client,
+            report=report,
+        )
+
+        assert report["stages"]["upload"]["items"] == 1
+        assert report["stages"]["upload"]["busy_seconds"] >= 0.2
+        assert report["stages"]["mask"]["busy_seconds"] > 0
+
+    def test_failure_aborts_multipart_upload_and_stops_reader(
+        self, tmp_path, s3_client
+    ):
+        local_file = tmp_path / "duplicates.csv"
+        pd.DataFrame(
+            {
+                "student_id": [1234, 5678, 9012, 1234],
+                "name": ["John Smith", "Jane Doe", "Ann Lee", "John Smith"],
+            }
+        ).to_csv(local_file, index=False)
+
+        with pytest.raises(ValueError) as excinfo:
+            obfuscate_data(
+                local_file,
+                ["name"],
+                chunksize=2,
+                output="s3://dest-bucket-test/obfuscated/duplicates.csv",
+                pipeline_depth=1,
+                s3_client=s3_client,
+            )
+
+        assert "is not unique" in str(excinfo.value)
+        assert "Uploads" not in s3_client.list_multipart_uploads(
+            Bucket="dest-bucket-test"
+        )
+        assert "Contents" not in s3_client.list_objects_v2(Bucket="dest-bucket-test")
+        assert not [
+            thread
+            for thread in threading.enumerate()
+            if thread.name.startswith("obfuscator-")
+        ]
+
+    def test_part_size_below_s3_minimum_raises_error(self, sample_csv):
+        with pytest.raises(ValueError) as excinfo:
+            obfuscate_data(
+                sample_csv,
+                ["name"],
+                output="s3://dest-bucket-test/obfuscated/students.csv",
+                part_size=1024 * 1024,
+            )
+
+        assert "part_size must be at least" in str(excinfo.value)
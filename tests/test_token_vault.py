@@ -0,0 +1,198 @@
+import pytest
+import boto3
+import awswrangler as wr
+import pandas as pd
+from unittest.mock import patch
+from moto import mock_aws
+from src import lambda_function
+from src.lambda_function import lambda_handler
+from src.utils.obfuscator_lib import obfuscate_data
+from src.utils.token_vault import DynamoDBVault, SQLiteVault
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def dynamodb_client():
+    """Yields a mocked DynamoDB client with an empty token vault table."""
+    with mock_aws():
+        client = boto3.client("dynamodb", region_name="eu-west-2")
+        client.create_table(
+            TableName="token-vault-test",
+            KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield client
+
+
+@pytest.fixture
+def sample_df():
+    """Sample data with repeated PII values."""
+    return pd.DataFrame(
+        {
+            "student_id": [1234, 5678, 9012, 3456],
+            "name": ["John Smith", "Jane Doe", "John Smith", None],
+            "course": ["Software", "Data Science", "DevOps", "Cloud"],
+        }
+    )
+
+
+class TestSQLiteVault:
+    def test_tokens_are_stable_and_reversible(self):
+        vault = SQLiteVault()
+
+        tokens = vault.tokenize_many("name", ["John Smith", "Jane Doe", "John Smith"])
+        again = vault.tokenize_many("name", ["Jane Doe"])
+
+        assert len(tokens) == 2
+        assert again["Jane Doe"] == tokens["Jane Doe"]
+        assert tokens["John Smith"] != tokens["Jane Doe"]
+        assert vault.detokenize_many("name", tokens.values()) == {
+            token: value for value, token in tokens.items()
+        }
+
+    def test_tokens_are_persisted_and_scoped_per_column(self, tmp_path):
+        db_path = str(tmp_path / "vault.db")
+        tokens = SQLiteVault(db_path).tokenize_many("name", ["John Smith"])
+
+        # a new vault (cold cache) on the same database resolves the same token
+        vault = SQLiteVault(db_path)
+        assert vault.tokenize_many("name", ["John Smith"]) == tokens
+        assert vault.tokenize_many("email", ["John Smith"]) != tokens
+
+    def test_lru_cache_keeps_repeated_values_from_backend(self):
+        vault = SQLiteVault(cache_size=4)
+        vault.tokenize_many("name", ["a", "b"])
+
+        with patch.object(
+            vault, "_lookup_tokens", wraps=vault._lookup_tokens
+        ) as lookup:
+            vault.tokenize_many("name", ["a", "b", "a"])
+            assert lookup.call_count == 0
+
+            # 'a' and 'b' (4 cache entries, both directions) are evicted by 'c' and 'd'
+            vault.tokenize_many("name", ["c", "d"])
+            vault.tokenize_many("name", ["a"])
+            assert lookup.call_count == 2
+
+    def test_obfuscate_data_tokenizes_with_one_batch_per_column_chunk(
+        self, tmp_path, sample_df
+    ):
+        local_file = tmp_path / "students.csv"
+        sample_df.to_csv(local_file, index=False)
+        vault = SQLiteVault()
+
+        with patch.object(
+            vault, "_lookup_tokens", wraps=vault._lookup_tokens
+        ) as lookup:
+            result = obfuscate_data(
+                local_file,
+                ["name", "course"],
+                chunksize=2,
+                strategy="tokenize",
+                vault=vault,
+            )
+        # one batch per column chunk (2 columns x 2 chunks), except the second
+        # 'name' chunk: 'John Smith' is served by the LRU cache, None is not tokenized
+        assert lookup.call_count == 3
+
+        result_df = pd.read_csv(result)
+        assert result_df["name"][0] == result_df["name"][2]
+        assert result_df["name"][0].startswith("tok_")
+        assert pd.isna(result_df["name"][3])
+        restored = vault.detokenize_many("name", result_df["name"].dropna())
+        assert restored[result_df["name"][1]] == "Jane Doe"
+
+    def test_tokenize_without_vault_raises_error(self, sample_df):
+        data = sample_df.to_csv(index=False).encode("utf-8")
+
+        with pytest.raises(ValueError) as excinfo:
+            obfuscate_data(data, ["name"], file_format="csv", strategy="tokenize")
+
+        assert "requires a token vault" in str(excinfo.value)
+
+
+class TestDynamoDBVault:
+    def test_batched_tokens_are_shared_between_vaults(self, dynamodb_client):
+        # more values than a single BatchGetItem / TransactWriteItems request takes
+        values = [f"student{i}@email.com" for i in range(150)]
+        calls = []
+        dynamodb_client.meta.events.register(
+            "before-call.dynamodb", lambda model, **kwargs: calls.append(model.name)
+        )
+
+        tokens = DynamoDBVault("token-vault-test", dynamodb_client).tokenize_many(
+            "email_address", values
+        )
+
+        # one round trip per batch of unique values
+        assert calls == ["BatchGetItem"] * 2 + ["TransactWriteItems"] * 3
+        other_vault = DynamoDBVault("token-vault-test", dynamodb_client)
+
+        assert other_vault.tokenize_many("email_address", values) == tokens
+        restored = other_vault.detokenize_many("email_address", tokens.values())
+        assert sorted(restored.values()) == sorted(values)
+
+    def test_concurrent_writers_get_the_same_token(self, dynamodb_client):
+        first_vault = DynamoDBVault("token-vault-test", dynamodb_client)
+        second_vault = DynamoDBVault("token-vault-test", dynamodb_client)
+        lookup_tokens = second_vault._lookup_tokens
+        stale_lookups = []
+
+        def stale_first_lookup(column, values):
+            # the second writer looked the values up before the first one inserted them
+            if not stale_lookups:
+                stale_lookups.append(values)
+                return {}
+            return lookup_tokens(column, values)
+
+        with patch.object(second_vault, "_lookup_tokens", stale_first_lookup):
+            tokens = first_vault.tokenize_many("name", ["John Smith", "Jane Doe"])
+            racing = second_vault.tokenize_many("name", ["John Smith", "Ann Lee"])
+
+        assert stale_lookups == [["John Smith", "Ann Lee"]]
+        assert racing["John Smith"] == tokens["John Smith"]
+        assert first_vault.tokenize_many("name", ["Ann Lee"]) == {
+            "Ann Lee": racing["Ann Lee"]
+        }
+        assert second_vault.detokenize_many("name", [tokens["John Smith"]]) == {
+            tokens["John Smith"]: "John Smith"
+        }
+
+    def test_lambda_tokenizes_with_dynamodb_vault(
+        self, dynamodb_client, monkeypatch, sample_df
+    ):
+        s3_client = boto3.client("s3", region_name="eu-west-2")
+        for bucket in ("source-bucket-test", "dest-bucket-test"):
+            s3_client.create_bucket(
+                Bucket=bucket,
+                CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+            )
+        monkeypatch.setenv("DESTINATION_BUCKET", "dest-bucket-test")
+        monkeypatch.setenv("TOKEN_VAULT_TABLE", "token-vault-test")
+        monkeypatch.setattr(lambda_function, "_TOKEN_VAULT", None)
+        wr.s3.to_csv(
+            df=sample_df, path="s3://source-bucket-test/new_data/data.csv", index=False
+        )
+
+        mock_event = {
+            "file_to_obfuscate": "s3://source-bucket-test/new_data/data.csv",
+            "pii_fields": ["name"],
+            "strategy": "tokenize",
+        }
+        lambda_handler(mock_event, None)
+
+        result_df = wr.s3.read_csv("s3://dest-bucket-test/obfuscated/new_data/data.csv")
+        vault = DynamoDBVault("token-vault-test", dynamodb_client)
+        restored = vault.detokenize_many("name", result_df["name"].dropna())
+        assert restored[result_df["name"][0]] == "John Smith"
+        assert restored[result_df["name"][1]] == "Jane Doe"
@@ -0,0 +1,152 @@
+import pytest
+import pandas as pd
+from io import BytesIO
+from src.utils.obfuscator_lib import (
+    _detect_primary_key,
+    _obfuscate_frame,
+    obfuscate_data,
+)
+from src.utils.token_vault import SQLiteVault
+
+
+@pytest.fixture
+def wide_df():
+    """200 rows x 201 columns, 100 string PII columns and 100 float columns."""
+    rows = 200
+    data = {"student_id": range(10_000, 10_000 + rows)}
+    for i in range(100):
+        data[f"pii_{i}"] = [f"Student {j}" for j in range(rows)]
+        data[f"metric_{i}"] = [j * 0.5 for j in range(rows)]
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def wide_parquet(wide_df):
+    buffer = BytesIO()
+    wide_df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pii_fields(wide_df):
+    return [col for col in wide_df.columns if col.startswith("pii_")]
+
+
+class TestBatchMasking:
+    def test_masking_does_not_fragment_the_frame(self, wide_df, pii_fields):
+        blocks_before = wide_df._mgr.nblocks
+
+        _obfuscate_frame(wide_df, pii_fields)
+
+        assert wide_df._mgr.nblocks <= blocks_before
+        assert (wide_df[pii_fields] == "***").all().all()
+        assert wide_df["metric_3"].iloc[3] == 1.5
+
+    def test_non_string_and_null_pii_columns_are_masked(self):
+        df = pd.DataFrame(
+            {
+                "student_id": [1234, 5678],
+                "name": ["John Smith", None],
+                "phone_number": [7700900001, 7700900002],
+            }
+        )
+
+        _obfuscate_frame(df, ["name", "phone_number"])
+
+        assert list(df["name"]) == ["***", "***"]
+        assert list(df["phone_number"]) == ["***", "***"]
+        assert list(df["student_id"]) == [1234, 5678]
+
+    def test_primary_key_is_first_key_like_column(self):
+        df = pd.DataFrame(
+            {
+                "email": ["a@email.com", "b@email.com"],
+                "course": ["Software", "Software"],
+                "student_id": [1234, 5678],
+                "enrolment_id": ["E001", "E002"],
+            }
+        )
+
+        assert _detect_primary_key(df, ["email"], "test") == "student_id"
+
+
+class TestArrowPassthrough:
+    def test_parquet_output_matches_pandas_path(
+        self, wide_df, wide_parquet, pii_fields
+    ):
+        report = {}
+
+        result = obfuscate_data(
+            wide_parquet,
+            pii_fields,
+            file_format="parquet",
+            verify_integrity=True,
+            report=report,
+        )
+
+        expected = wide_df.copy()
+        _obfuscate_frame(expected, pii_fields)
+        pd.testing.assert_frame_equal(pd.read_parquet(result), expected)
+        assert report["primary_key"] == "student_id"
+        assert report["columns"] == list(wide_df.columns)
+        assert report["integrity"]["verified"] is True
+
+    def test_streamed_chunks_match_in_memory_output(self, wide_parquet, pii_fields):
+        report = {}
+
+        streamed = obfuscate_data(
+            wide_parquet, pii_fields, file_format="parquet", chunksize=64, report=report
+        )
+
+        assert report["chunks"] == 4
+        in_memory = obfuscate_data(wide_parquet, pii_fields, file_format="parquet")
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(streamed), pd.read_parquet(in_memory)
+        )
+
+    @pytest.mark.parametrize("strategy", ["mask", "tokenize"])
+    @pytest.mark.parametrize("chunksize", [None, 2])
+    def test_masked_non_string_columns_read_back_with_pandas(
+        self, tmp_path, strategy, chunksize
+    ):
+        local_file = tmp_path / "students.parquet"
+        pd.DataFrame(
+            {
+                "student_id": [1234, 5678, 9012],
+                "phone": pd.array([7700900001, None, 7700900003], dtype="Int64"),
+                "birth_date": pd.to_datetime(["2001-02-03", "2002-03-04", None]),
+            }
+        ).to_parquet(local_file, index=False)
+
+        result = obfuscate_data(
+            local_file,
+            ["phone", "birth_date"],
+            chunksize=chunksize,
+            strategy=strategy,
+            vault=SQLiteVault(),
+        )
+
+        # the pandas metadata no longer gives the masked columns their old dtypes
+        result_df = pd.read_parquet(result)
+        assert result_df["phone"].dtype == object
+        assert result_df["birth_date"].dtype == object
+        assert list(result_df["student_id"]) == [1234, 5678, 9012]
+        if strategy == "mask":
+            assert list(result_df["phone"]) == ["***"] * 3
+
+    def test_tokenize_strategy_on_arrow_path(self, wide_parquet):
+        vault = SQLiteVault()
+
+        result = obfuscate_data(
+            wide_parquet,
+            ["pii_0"],
+            file_format="parquet",
+            strategy="tokenize",
+            vault=vault,
+        )
+
+        result_df = pd.read_parquet(result)
+        assert result_df["pii_0"].nunique() == 200
+        token = result_df["pii_0"].iloc[7]
+        assert vault.detokenize_many("pii_0", [token]) == {token: "Student 7"}
+        assert result_df["pii_1"].iloc[7] == "Student 7"